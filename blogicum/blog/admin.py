@@ -1,8 +1,25 @@
 from django.contrib import admin
 
+from . import search
 from .models import Category, Comment, Location, Post
 
 
+class FullTextSearchMixin:
+    """Search the changelist through the FTS5 index instead of LIKE."""
+
+    search_lookup = 'search_entry__document__match'
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search.is_available(queryset.db):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        expression = search.match_expression(search_term)
+        if expression is None:
+            return queryset, False
+        return queryset.filter(**{self.search_lookup: expression}), False
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('title', 'slug', 'is_published', 'created_at')
@@ -18,7 +35,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'author',
@@ -26,14 +43,17 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'pub_date',
         'is_published',
+        'comment_count',
         'created_at',
     )
     list_editable = ('is_published',)
     list_filter = ('is_published', 'category', 'location')
+    list_select_related = ('author', 'category', 'location')
     search_fields = ('title', 'text')
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('text', 'author', 'post', 'created_at')
+    list_select_related = ('author', 'post')
     search_fields = ('text',)
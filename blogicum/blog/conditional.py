@@ -0,0 +1,89 @@
+"""ETag/Last-Modified validators for conditional GETs of blog pages.
+
+Validators are built from indexed ``MAX()`` lookups of ``updated_at`` and
+``pub_date``.  Timestamps cannot see deletions or edits of users,
+categories and locations shown on every page, so those bump the
+``content`` tag of the page cache, which is part of every ETag.
+"""
+import hashlib
+
+from django.db.models import Max
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import Category, Comment, Post
+from .page_cache import tag_versions
+
+CONTENT_TAG = 'content'
+
+
+def _max(queryset, field):
+    return queryset.order_by().aggregate(value=Max(field))['value']
+
+
+def feed_timestamps(request, *args, **kwargs):
+    """Last change of any post and the newest post that has gone live.
+
+    Scheduled posts go live without a save, hence the ``pub_date`` part.
+    """
+    return [
+        _max(Post.objects.all(), 'updated_at'),
+        _max(
+            Post.objects.filter(
+                is_published=True, pub_date__lte=timezone.now()
+            ),
+            'pub_date',
+        ),
+    ]
+
+
+def category_timestamps(request, category_slug):
+    return [
+        *feed_timestamps(request),
+        _max(Category.objects.filter(slug=category_slug), 'updated_at'),
+    ]
+
+
+def post_timestamps(request, post_id):
+    post = Post.objects.filter(pk=post_id).values(
+        'updated_at', 'pub_date'
+    ).first()
+    if post is None:
+        return []
+    return [
+        post['updated_at'],
+        post['pub_date'] if post['pub_date'] <= timezone.now() else None,
+        _max(Comment.objects.filter(post_id=post_id), 'updated_at'),
+    ]
+
+
+def conditional_page(timestamps_func):
+    """``condition()`` with validators computed once per request.
+
+    The ETag also covers the viewer, whose own hidden posts and comment
+    form change the page.
+    """
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, '_page_validators'):
+            timestamps = [
+                value
+                for value in timestamps_func(request, *args, **kwargs)
+                if value is not None
+            ]
+            fingerprint = repr((
+                [value.isoformat() for value in timestamps],
+                tag_versions([CONTENT_TAG])[CONTENT_TAG],
+                request.user.pk,
+            ))
+            request._page_validators = (
+                hashlib.md5(fingerprint.encode()).hexdigest(),
+                max(timestamps, default=None),
+            )
+        return request._page_validators
+
+    return condition(
+        etag_func=lambda *args, **kwargs: validators(*args, **kwargs)[0],
+        last_modified_func=(
+            lambda *args, **kwargs: validators(*args, **kwargs)[1]
+        ),
+    )
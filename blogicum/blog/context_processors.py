@@ -1,17 +1,77 @@
+import time
+
+from django.core.cache import cache
 from django.db import DatabaseError
 from django.db.utils import OperationalError, ProgrammingError
+from django.utils.functional import SimpleLazyObject
 
 from .models import Category
 
+MENU_VERSION_KEY = 'blog:menu-categories-version'
+# Safety net for changes that bypass signals, e.g. ``QuerySet.update()``.
+MENU_TIMEOUT = 60 * 60
 
-def menu_categories(request):
-    """Return published categories for the top navigation menu."""
+# (version, expiry, categories) of the last menu this process has seen.
+_local_menu = (None, 0, None)
+
+
+def _new_version():
+    # Never restart from a fixed number: after a cache flush the version
+    # must differ from the one process-local copies were stored under.
+    return time.time_ns()
+
+
+def invalidate_menu_categories():
     try:
+        cache.incr(MENU_VERSION_KEY)
+    except ValueError:
+        cache.set(MENU_VERSION_KEY, _new_version(), None)
+
+
+def _get_menu_version():
+    version = cache.get(MENU_VERSION_KEY)
+    if version is None:
+        cache.add(MENU_VERSION_KEY, _new_version(), None)
+        version = cache.get(MENU_VERSION_KEY)
+    return version
+
+
+def get_menu_categories():
+    """Published categories as ``{'title', 'slug'}`` dicts, cached.
+
+    Each process keeps the last menu it has seen and checks it against the
+    version in the shared cache, which is bumped on every category change.
+    """
+    global _local_menu
+    version = _get_menu_version()
+    local_version, expires_at, categories = _local_menu
+    if local_version == version and time.monotonic() < expires_at:
+        return categories
+
+    key = f'blog:menu-categories:{version}'
+    categories = cache.get(key)
+    if categories is None:
         categories = list(
-            Category.objects.filter(
-                is_published=True
-            ).order_by('title')
+            Category.objects.filter(is_published=True)
+            .order_by('title')
+            .values('title', 'slug')
         )
+        cache.set(key, categories, MENU_TIMEOUT)
+    _local_menu = (version, time.monotonic() + MENU_TIMEOUT, categories)
+    return categories
+
+
+def _menu_categories_or_empty():
+    try:
+        return get_menu_categories()
     except (DatabaseError, OperationalError, ProgrammingError, RuntimeError):
-        categories = []
-    return {'menu_categories': categories}
+        return []
+
+
+def menu_categories(request):
+    """Return published categories for the top navigation menu.
+
+    The list is only fetched when a template actually uses it, so admin
+    and error pages that never show the menu do not pay for it.
+    """
+    return {'menu_categories': SimpleLazyObject(_menu_categories_or_empty)}
@@ -0,0 +1,192 @@
+"""Drop CSS rules whose selectors can never match the site's markup.
+
+A deliberately small parser for minified stylesheets such as Bootstrap:
+it splits rules and at-rules, keeps a selector when every class it
+requires is in use, and leaves declarations untouched.
+"""
+import re
+from pathlib import Path
+
+CLASS_ATTR_RE = re.compile(r'class="([^"]*)"')
+PYTHON_STRING_RE = re.compile(r"""'([^'\n]*)'|"([^"\n]*)\"""")
+TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)')
+WORD_RE = re.compile(r'-?[_a-zA-Z][\w-]*')
+KEYFRAMES_RE = re.compile(r'@(?:-webkit-)?keyframes\s+([\w-]+)')
+# At-rules whose body is a list of ordinary rules.
+GROUPING_AT_RULES = ('@media', '@supports')
+# Tags every page has even if no template spells them out.
+DOCUMENT_TAGS = frozenset(('html', 'head', 'body'))
+
+
+def _skip_string(css, start):
+    quote, index = css[start], start + 1
+    while index < len(css) and css[index] != quote:
+        index += 2 if css[index] == '\\' else 1
+    return index + 1
+
+
+def _skip_comment(css, start):
+    end = css.find('*/', start + 2)
+    return len(css) if end == -1 else end + 2
+
+
+def split_rules(css):
+    """Yield ``(prelude, body)`` for top-level rules of ``css``.
+
+    Statements such as ``@charset`` or ``@import`` come with body ``None``;
+    comments are dropped.
+    """
+    index, depth, prelude_start, body_start = 0, 0, 0, None
+    prelude = ''
+    while index < len(css):
+        char = css[index]
+        if char in '"\'':
+            index = _skip_string(css, index)
+            continue
+        if css.startswith('/*', index):
+            end = _skip_comment(css, index)
+            if depth == 0:
+                prelude += css[prelude_start:index]
+                prelude_start = end
+            index = end
+            continue
+        if char == '{':
+            if depth == 0:
+                prelude += css[prelude_start:index]
+                body_start = index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                yield prelude.strip(), css[body_start:index]
+                prelude, prelude_start = '', index + 1
+        elif char == ';' and depth == 0:
+            yield (prelude + css[prelude_start:index]).strip(), None
+            prelude, prelude_start = '', index + 1
+        index += 1
+
+
+def split_selectors(prelude):
+    """Split a selector list on commas outside brackets and strings."""
+    selectors, depth, start, index = [], 0, 0, 0
+    while index < len(prelude):
+        char = prelude[index]
+        if char in '"\'':
+            index = _skip_string(prelude, index)
+            continue
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:index].strip())
+            start = index + 1
+        index += 1
+    selectors.append(prelude[start:].strip())
+    return [selector for selector in selectors if selector]
+
+
+def _simplify(selector):
+    # Attribute values and :not() arguments never require a class: a
+    # missing class makes :not() match *more* elements, not fewer.
+    selector = re.sub(r'\[[^\]]*\]', '', selector)
+    previous = None
+    while previous != selector:
+        previous = selector
+        selector = re.sub(r':not\([^()]*\)', '', selector)
+    return selector
+
+
+def selector_requirements(selector):
+    """Classes and tag names an element tree must have to match."""
+    selector = _simplify(selector)
+    classes = set(re.findall(r'\.(-?[_a-zA-Z][\w-]*)', selector))
+    rest = re.sub(r'\.-?[_a-zA-Z][\w-]*|#[\w-]+', ' ', selector)
+    rest = re.sub(r'::?[\w-]+(\([^()]*\))?', ' ', rest)
+    tags = {tag.lower() for tag in WORD_RE.findall(rest)}
+    return classes, tags
+
+
+def _selector_filter(classes, tags):
+    def keep(selector):
+        required_classes, required_tags = selector_requirements(selector)
+        if not required_classes <= classes:
+            return False
+        return tags is None or required_tags <= tags
+    return keep
+
+
+def _purge_rules(css, keep):
+    output = []
+    for prelude, body in split_rules(css):
+        if body is None:
+            output.append(f'{prelude};')
+        elif prelude.startswith(GROUPING_AT_RULES):
+            inner = _purge_rules(body, keep)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [s for s in split_selectors(prelude) if keep(s)]
+            if selectors:
+                output.append(f'{",".join(selectors)}{{{body.strip()}}}')
+    return ''.join(output)
+
+
+def _drop_unused_keyframes(css):
+    rules = list(split_rules(css))
+    used_text = ''.join(
+        body or '' for prelude, body in rules
+        if not KEYFRAMES_RE.match(prelude)
+    )
+    output = []
+    for prelude, body in rules:
+        match = KEYFRAMES_RE.match(prelude)
+        if match and not re.search(rf'\b{match[1]}\b', used_text):
+            continue
+        if body is None:
+            output.append(f'{prelude};')
+        else:
+            output.append(f'{prelude}{{{body}}}')
+    return ''.join(output)
+
+
+def purge(css, classes, tags=None):
+    """Keep the rules of ``css`` that can match the given classes.
+
+    With ``tags``, rules that need any other element are dropped too,
+    which is how the critical subset for one page region is cut out.
+    """
+    purged = _purge_rules(css, _selector_filter(set(classes), tags))
+    return _drop_unused_keyframes(purged)
+
+
+def _words(values):
+    return {word for value in values for word in WORD_RE.findall(value)}
+
+
+def used_classes(template_dirs, python_dirs=()):
+    """Every word that may end up in a ``class`` attribute.
+
+    Templates contribute their ``class="..."`` values; Python sources,
+    where form renderers build class lists, contribute every string
+    literal.  Over-collecting only keeps a few extra rules.
+    """
+    values = []
+    for directory in template_dirs:
+        for path in Path(directory).rglob('*.html'):
+            values += CLASS_ATTR_RE.findall(path.read_text('utf-8'))
+    for directory in python_dirs:
+        for path in Path(directory).rglob('*.py'):
+            for single, double in PYTHON_STRING_RE.findall(
+                path.read_text('utf-8')
+            ):
+                values.append(single or double)
+    return _words(values)
+
+
+def markup_classes_and_tags(markup):
+    classes = _words(CLASS_ATTR_RE.findall(markup))
+    tags = {tag.lower() for tag in TAG_RE.findall(markup)}
+    return classes, tags | DOCUMENT_TAGS
@@ -0,0 +1,316 @@
+"""Bulk generated data for load tests and benchmarks.
+
+Unlike ``seed_demo``'s hand-written showcase this produces any number of
+users, posts and comments quickly: rows go in with ``bulk_create`` in
+chunks of one transaction each, and the columns ``Post.save()`` and the
+comment signals would derive are filled in directly.
+
+Authors, categories and comment counts follow Zipf's law, as they do on
+real blogs: a few users write most posts and a few posts get most
+comments.  The same ``seed`` always produces the same data.
+"""
+import random
+from contextlib import nullcontext
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import search
+from .conditional import CONTENT_TAG
+from .context_processors import invalidate_menu_categories
+from .models import (
+    Category, Comment, Location, Post, make_excerpt, render_text
+)
+from .page_cache import invalidate_tags
+from .pagination import invalidate_feed_counts
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'loaduser'
+PASSWORD = 'load12345'
+CATEGORIES = 8
+LOCATIONS = 10
+# Rows per transaction.
+CHUNK_SIZE = 20000
+ZIPF_EXPONENT = 1.0
+# Share of posts a visitor must not see: hidden or scheduled.
+HIDDEN_SHARE = 0.03
+SCHEDULED_SHARE = 0.02
+UNPUBLISHED_CATEGORY_SHARE = 0.1
+NO_LOCATION_SHARE = 0.2
+# Texts are drawn from pools generated once: rendering the HTML and the
+# excerpt of every row would cost more than inserting it.
+TEXT_POOL_SIZE = 4096
+# Smaller loads keep the search triggers instead of rebuilding the index.
+REINDEX_THRESHOLD = 100000
+WORDS = (
+    'django', 'запрос', 'шаблон', 'модель', 'индекс', 'кэш', 'страница',
+    'форма', 'тест', 'миграция', 'сервер', 'база', 'данных', 'поиск',
+    'лента', 'профиль', 'комментарий', 'категория', 'публикация', 'автор',
+    'быстро', 'медленно', 'надёжно', 'удобно', 'просто', 'сложно',
+    'сегодня', 'вчера', 'завтра', 'проект', 'команда', 'ревью', 'релиз',
+    'ошибка', 'исправление', 'оптимизация', 'нагрузка', 'пользователь',
+)
+
+
+def _sentence(rng, words):
+    sentence = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return sentence.capitalize() + '.'
+
+
+def _text(rng, sentences):
+    return ' '.join(
+        _sentence(rng, rng.randint(5, 14)) for _ in range(sentences)
+    )
+
+
+def zipf_weights(count, exponent=ZIPF_EXPONENT):
+    """Cumulative weights of ranks ``1..count`` under Zipf's law."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def zipf_counts(total, count, rng, exponent=ZIPF_EXPONENT):
+    """Split ``total`` into ``count`` Zipf-distributed parts.
+
+    Rank ``k`` gets its expected share ``total / k**s / H``; the rounding
+    remainder is drawn at random.  Ranks are shuffled over the positions,
+    so the largest part does not always go to the first item.
+    """
+    if not count:
+        return []
+    weights = zipf_weights(count, exponent)
+    scale = total / weights[-1]
+    previous = 0.0
+    counts = []
+    for weight in weights:
+        counts.append(int((weight - previous) * scale))
+        previous = weight
+    for rank in rng.choices(range(count), cum_weights=weights,
+                            k=total - sum(counts)):
+        counts[rank] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def _next_id(model):
+    # SQLite's bulk_create does not return primary keys, so they are set.
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def _chunks(total, size):
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+
+def _insert(model, objects):
+    with transaction.atomic():
+        model.objects.bulk_create(objects)
+
+
+class Generator:
+    def __init__(self, seed, chunk_size, progress):
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.progress = progress or (lambda label, done, total: None)
+        # Dates are counted from midnight so a rerun on the same day
+        # produces the same rows.
+        self.base = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+
+    def users(self, count):
+        first_id = _next_id(User)
+        password = make_password(PASSWORD)
+        for start, end in _chunks(count, self.chunk_size):
+            _insert(User, [
+                User(
+                    id=first_id + index,
+                    username=f'{USERNAME_PREFIX}{first_id + index:07d}',
+                    first_name=self.rng.choice(WORDS).capitalize(),
+                    password=password,
+                )
+                for index in range(start, end)
+            ])
+            self.progress('Пользователи', end, count)
+        return list(range(first_id, first_id + count))
+
+    def categories(self, count):
+        first_id = _next_id(Category)
+        _insert(Category, [
+            Category(
+                id=first_id + index,
+                title=f'Категория {first_id + index}',
+                slug=f'load-category-{first_id + index}',
+                description=_sentence(self.rng, 8),
+                # The most popular category is always shown.
+                is_published=(
+                    index == 0
+                    or self.rng.random() >= UNPUBLISHED_CATEGORY_SHARE
+                ),
+            )
+            for index in range(count)
+        ])
+        return list(range(first_id, first_id + count))
+
+    def locations(self):
+        first_id = _next_id(Location)
+        _insert(Location, [
+            Location(id=first_id + index, name=f'Город {index}')
+            for index in range(LOCATIONS)
+        ])
+        return list(range(first_id, first_id + LOCATIONS))
+
+    def _pub_date(self, roll):
+        if roll < SCHEDULED_SHARE:
+            return self.base + timedelta(
+                seconds=self.rng.randint(86400, 30 * 86400)
+            )
+        return self.base - timedelta(
+            seconds=self.rng.randint(60, 365 * 86400)
+        )
+
+    def posts(self, count, authors, categories, locations, comment_counts):
+        rng = self.rng
+        first_id = _next_id(Post)
+        pool = [
+            (text, render_text(text), make_excerpt(text))
+            for text in (
+                _text(rng, rng.randint(2, 8)) for _ in range(TEXT_POOL_SIZE)
+            )
+        ]
+        author_weights = zipf_weights(len(authors))
+        category_weights = zipf_weights(len(categories))
+        for start, end in _chunks(count, self.chunk_size):
+            size = end - start
+            post_authors = rng.choices(
+                authors, cum_weights=author_weights, k=size
+            )
+            post_categories = rng.choices(
+                categories, cum_weights=category_weights, k=size
+            )
+            posts = []
+            for offset, index in enumerate(range(start, end)):
+                text, text_html, excerpt = rng.choice(pool)
+                roll = rng.random()
+                posts.append(Post(
+                    id=first_id + index,
+                    title=_sentence(rng, rng.randint(2, 6))[:-1],
+                    text=text,
+                    text_html=text_html,
+                    excerpt=excerpt,
+                    pub_date=self._pub_date(roll),
+                    is_published=not (
+                        SCHEDULED_SHARE <= roll
+                        < SCHEDULED_SHARE + HIDDEN_SHARE
+                    ),
+                    author_id=post_authors[offset],
+                    category_id=post_categories[offset],
+                    location_id=(
+                        None if rng.random() < NO_LOCATION_SHARE
+                        else rng.choice(locations)
+                    ),
+                    comment_count=comment_counts[index],
+                ))
+            _insert(Post, posts)
+            self.progress('Публикации', end, count)
+        return first_id
+
+    def comments(self, total, first_post_id, comment_counts, authors):
+        rng = self.rng
+        pool = [
+            (text, render_text(text))
+            for text in (
+                _sentence(rng, rng.randint(4, 20))
+                for _ in range(TEXT_POOL_SIZE)
+            )
+        ]
+        author_weights = zipf_weights(len(authors))
+        done = 0
+        batch = []
+        for index, count in enumerate(comment_counts):
+            post_id = first_post_id + index
+            for author_id in rng.choices(
+                authors, cum_weights=author_weights, k=count
+            ):
+                text, text_html = rng.choice(pool)
+                batch.append(Comment(
+                    post_id=post_id,
+                    author_id=author_id,
+                    text=text,
+                    text_html=text_html,
+                ))
+            if len(batch) >= self.chunk_size:
+                _insert(Comment, batch)
+                done += len(batch)
+                batch = []
+                self.progress('Комментарии', done, total)
+        if batch:
+            _insert(Comment, batch)
+            self.progress('Комментарии', total, total)
+
+
+def invalidate_caches():
+    """Drop what is cached from rows written without model signals.
+
+    The menu, the feed counts and every cached page (all of them are
+    tagged ``menu``) are rebuilt; post cards are keyed by their content.
+    """
+    invalidate_feed_counts()
+    invalidate_menu_categories()
+    invalidate_tags('feed', 'menu', CONTENT_TAG)
+
+
+def _reset_sequences():
+    # Primary keys were set explicitly; PostgreSQL sequences must catch up.
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [User, Category, Location, Post, Comment]
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def seed_bulk(users=0, posts=0, comments=0, categories=0, seed=0,
+              chunk_size=CHUNK_SIZE, progress=None):
+    """Add generated users, categories, posts and comments.
+
+    Posts are written by the new users and filed under the new categories,
+    or by existing ones when none are created.  Comments go to the new
+    posts.  ``progress(label, done, total)`` is called after every chunk.
+    """
+    if comments and not posts:
+        raise ValueError('Комментарии добавляются только к новым публикациям.')
+    generator = Generator(seed, chunk_size, progress)
+    comment_counts = zipf_counts(comments, posts, generator.rng)
+    authors = generator.users(users) or list(
+        User.objects.order_by('pk').values_list('pk', flat=True)
+    )
+    category_ids = generator.categories(categories) or list(
+        Category.objects.order_by('pk').values_list('pk', flat=True)
+    )
+    if posts and not (authors and category_ids):
+        raise ValueError('Для публикаций нужны авторы и категории.')
+
+    if posts + comments >= REINDEX_THRESHOLD:
+        indexing = search.triggers_paused(connection)
+    else:
+        indexing = nullcontext()
+    with indexing:
+        if posts:
+            first_post_id = generator.posts(
+                posts, authors, category_ids, generator.locations(),
+                comment_counts,
+            )
+            generator.comments(
+                comments, first_post_id, comment_counts, authors
+            )
+    _reset_sequences()
+    invalidate_caches()
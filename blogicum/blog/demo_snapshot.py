@@ -0,0 +1,97 @@
+"""Snapshot of freshly seeded demo data for ``start_demo``.
+
+The SQLite database and ``MEDIA_ROOT/posts_images`` are saved right after
+``seed_demo`` and restored on later starts instead of migrating and
+seeding again.  A snapshot is keyed by the migration files, the modules
+that shape the stored rows, the seed data version, the day it was seeded
+on (demo dates are relative to it) and whether images were downloaded.
+"""
+import hashlib
+import inspect
+import os
+import shutil
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.db.migrations.loader import MigrationLoader
+from django.utils import timezone
+
+from . import demo_data, images, models
+
+DATABASE_FILE = 'db.sqlite3'
+IMAGES_DIR = 'posts_images'
+# Fill derived columns, write renditions or generate rows.
+SHAPING_MODULES = (models, images, demo_data)
+
+
+def snapshot_key(seed_version, offline):
+    """Digest of what the seeded database and images depend on."""
+    digest = hashlib.sha256()
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    for key in sorted(loader.disk_migrations):
+        digest.update(repr(key).encode())
+        source = inspect.getsourcefile(type(loader.disk_migrations[key]))
+        digest.update(Path(source).read_bytes())
+    for module in SHAPING_MODULES:
+        digest.update(Path(inspect.getsourcefile(module)).read_bytes())
+    digest.update(repr(
+        (seed_version, bool(offline), timezone.localdate().isoformat())
+    ).encode())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_dir(key):
+    return Path(settings.DEMO_CACHE_DIR) / 'snapshots' / key
+
+
+def copy_database(source, target):
+    """Copy an SQLite database page by page with the backup API.
+
+    Unlike copying the file this is consistent while the source is in use
+    and takes the WAL of either side into account.
+    """
+    with closing(sqlite3.connect(source)) as src:
+        with closing(sqlite3.connect(target)) as dst:
+            src.backup(dst)
+
+
+def _copy_images(source, target):
+    if target.exists():
+        shutil.rmtree(target)
+    if source.exists():
+        # Copies, not links: regenerated renditions overwrite files in place.
+        shutil.copytree(source, target)
+
+
+def save(directory, database, media_root):
+    """Save ``database`` and the post images as the snapshot ``directory``.
+
+    Older snapshots are removed: only the current code can use them.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    for old in directory.parent.iterdir():
+        shutil.rmtree(old)
+    temporary = directory.with_name(f'{directory.name}.tmp')
+    temporary.mkdir()
+    copy_database(database, temporary / DATABASE_FILE)
+    _copy_images(Path(media_root) / IMAGES_DIR, temporary / IMAGES_DIR)
+    # A snapshot appears complete or not at all.
+    os.replace(temporary, directory)
+
+
+def restore(directory, database, media_root):
+    """Restore the snapshot ``directory``; ``False`` if there is none.
+
+    The database is replaced behind the ORM's back, so nothing cached from
+    the previous data survives.
+    """
+    directory = Path(directory)
+    if not (directory / DATABASE_FILE).is_file():
+        return False
+    copy_database(directory / DATABASE_FILE, database)
+    _copy_images(directory / IMAGES_DIR, Path(media_root) / IMAGES_DIR)
+    demo_data.invalidate_caches()
+    return True
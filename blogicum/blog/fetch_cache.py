@@ -0,0 +1,73 @@
+"""On-disk cache of downloaded files for ``seed_demo``.
+
+Bodies are stored once under the SHA-256 of their content; every URL
+points at the hash of what it returned.  Writes go through a temporary
+file and ``os.replace``, so parallel downloads and interrupted runs never
+leave a half-written entry behind.
+"""
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_WORKERS = 8
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent)
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class FetchCache:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _url_path(self, url):
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / 'urls' / digest
+
+    def _object_path(self, digest):
+        return self.directory / 'objects' / digest[:2] / digest
+
+    def get(self, url):
+        """Cached body of ``url`` or ``None``."""
+        try:
+            digest = self._url_path(url).read_text('ascii').strip()
+            return self._object_path(digest).read_bytes()
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            _write_atomic(path, content)
+        _write_atomic(self._url_path(url), digest.encode('ascii'))
+
+
+def fetch_all(urls, fetch, cache, offline=False, workers=DEFAULT_WORKERS):
+    """Bodies of ``urls`` as ``{url: bytes or None}``.
+
+    Cached URLs are not requested again; the rest are downloaded with
+    ``fetch(url)`` by at most ``workers`` threads.  ``fetch`` returns
+    ``None`` on failure, which is not cached.  In ``offline`` mode only
+    the cache is used.
+    """
+    results = {url: cache.get(url) for url in dict.fromkeys(urls)}
+    missing = [url for url, content in results.items() if content is None]
+    if offline or not missing:
+        return results
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for url, content in zip(missing, executor.map(fetch, missing)):
+            if content is not None:
+                cache.put(url, content)
+            results[url] = content
+    return results
@@ -0,0 +1,312 @@
+"""Resized renditions of ``Post.image`` for ``srcset``.
+
+Renditions are written next to the original upload, e.g.
+``posts_images/photo_w480.jpg`` and ``posts_images/photo_w480.webp``, by a
+small thread pool once the transaction that saved the post has committed,
+so uploads never wait for Pillow.  What was generated is recorded in
+``Post.image_renditions``; browsers that understand WebP get the WebP
+copies through ``<picture>``, the rest fall back to JPEG.
+"""
+import base64
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor, wait
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger('blog.images')
+
+# Feed card on phones, card/detail column width and their 2x versions.
+CARD_WIDTH = 480
+DETAIL_WIDTH = 780
+RENDITION_WIDTHS = (CARD_WIDTH, DETAIL_WIDTH, 2 * CARD_WIDTH, 2 * DETAIL_WIDTH)
+# Cards and the post page share one column of at most 780px.
+IMAGE_SIZES = '(min-width: 812px) 780px, 100vw'
+JPEG_QUALITY = 82
+# WebP quality is picked per image: the highest step whose output fits
+# the byte budget, so flat screenshots keep detail and noisy photos shrink.
+WEBP_QUALITIES = (40, 50, 60, 70, 75, 80, 85, 90)
+WEBP_BYTES_PER_PIXEL = 0.12
+# Bumped when what renditions hold changes (a new format, WebP copies
+# bigger than JPEG dropped), so old records are redone.
+RENDITIONS_VERSION = 3
+RENDITION_WORKERS = 2
+# Inline preview shown, stretched and blurry, until the real image loads.
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 30
+EXIF_ORIENTATION = 0x0112
+# Orientations that rotate the image by 90 or 270 degrees.
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+_executor = ThreadPoolExecutor(
+    max_workers=RENDITION_WORKERS, thread_name_prefix='renditions'
+)
+_pending = set()
+
+
+def rendition_name(name, width, extension):
+    stem = posixpath.splitext(name)[0]
+    return f'{stem}_w{width}.{extension}'
+
+
+def _load(file):
+    image = Image.open(file)
+    image.load()
+    return ImageOps.exif_transpose(image)
+
+
+def open_image(name):
+    with default_storage.open(name) as file:
+        return _load(file)
+
+
+def _placeholder(image):
+    """Tiny WebP data URI of an image opened but not loaded yet.
+
+    ``thumbnail()`` lets JPEG decode at 1/8 scale (``draft``) and shrinks
+    the rest with ``reduce()`` first, so the full image is never decoded
+    at full size; EXIF rotation is applied to the thumbnail only.
+    """
+    if 'A' in image.getbands() or 'transparency' in image.info:
+        # It would show through the transparent parts once loaded.
+        return ''
+    image.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    output = BytesIO()
+    image.save(output, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    encoded = base64.b64encode(output.getvalue()).decode('ascii')
+    return f'data:image/webp;base64,{encoded}'
+
+
+def describe_image(file):
+    """Displayed width, height and an inline placeholder of an image file.
+
+    The size is read from the headers and swapped for EXIF rotations by
+    90 degrees, which is how browsers show it; uploads are described on
+    the request thread, so the image is not decoded at full size.
+    """
+    image = Image.open(file)
+    width, height = image.size
+    if image.getexif().get(EXIF_ORIENTATION) in TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    return {
+        'image_width': width,
+        'image_height': height,
+        'image_placeholder': _placeholder(image),
+    }
+
+
+def describe_stored_image(name):
+    """``describe_image()`` for a stored file; ``None`` if unreadable."""
+    try:
+        with default_storage.open(name) as file:
+            return describe_image(file)
+    except (OSError, ValueError):
+        return None
+
+
+def refresh_image_details(post, save_kwargs):
+    """Fill the stored size and placeholder of a newly uploaded image.
+
+    Only uploads not yet written to storage are read; existing images are
+    handled by the ``backfill_image_details`` command.
+    """
+    if 'image' in post.get_deferred_fields():
+        return
+    if not post.image:
+        details = dict.fromkeys(('image_width', 'image_height'))
+        details['image_placeholder'] = ''
+    elif not post.image._committed:
+        file = post.image.file
+        file.seek(0)
+        details = describe_image(file)
+        file.seek(0)
+    else:
+        return
+    for field, value in details.items():
+        setattr(post, field, value)
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None and 'image' in update_fields:
+        save_kwargs['update_fields'] = {*update_fields, *details}
+
+
+def _encode_jpeg(image):
+    if image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.convert('RGBA'))
+        image = background
+    output = BytesIO()
+    image.save(
+        output, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True
+    )
+    return output.getvalue()
+
+
+def _webp_bytes(image, quality):
+    output = BytesIO()
+    image.save(output, 'WEBP', quality=quality, method=4)
+    return output.getvalue()
+
+
+def _encode_webp(image, budget):
+    """Encode at the highest quality that fits ``budget`` bytes.
+
+    Returns ``(data, quality)``, or ``None`` when even the lowest quality
+    does not fit.  Binary search keeps it to three or four encodes.
+    """
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    low, high = 0, len(WEBP_QUALITIES) - 1
+    best = None
+    while low <= high:
+        middle = (low + high) // 2
+        data = _webp_bytes(image, WEBP_QUALITIES[middle])
+        if len(data) <= budget:
+            best = (data, WEBP_QUALITIES[middle])
+            low = middle + 1
+        else:
+            high = middle - 1
+    return best
+
+
+def _save(path, data):
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(data))
+
+
+def render_renditions(name):
+    """Write the JPEG and WebP renditions of image ``name``.
+
+    Widths above the original are skipped: upscaling only adds bytes.
+    A WebP copy is never bigger than its JPEG twin; a width whose WebP
+    does not fit is left to the JPEG fallback.
+    """
+    image = open_image(name)
+    jpeg, webp = [], []
+    for width in sorted(set(RENDITION_WIDTHS)):
+        if width > image.width:
+            break
+        resized = image.resize(
+            (width, round(image.height * width / image.width)),
+            Image.Resampling.LANCZOS,
+        )
+        jpeg_data = _encode_jpeg(resized)
+        path = rendition_name(name, width, 'jpg')
+        _save(path, jpeg_data)
+        jpeg.append({'width': width, 'name': path, 'size': len(jpeg_data)})
+
+        budget = min(
+            resized.width * resized.height * WEBP_BYTES_PER_PIXEL,
+            len(jpeg_data),
+        )
+        encoded = _encode_webp(resized, budget)
+        if encoded is None:
+            continue
+        webp_data, quality = encoded
+        path = rendition_name(name, width, 'webp')
+        _save(path, webp_data)
+        webp.append({
+            'width': width,
+            'name': path,
+            'size': len(webp_data),
+            'quality': quality,
+        })
+    jpeg_sizes = {item['width']: item['size'] for item in jpeg}
+    return {
+        'source': name,
+        'version': RENDITIONS_VERSION,
+        'jpeg': jpeg,
+        'webp': webp,
+        'webp_saved': sum(
+            jpeg_sizes[item['width']] - item['size'] for item in webp
+        ),
+    }
+
+
+def _rendition_names(renditions):
+    return {
+        rendition['name']
+        for kind in ('jpeg', 'webp')
+        for rendition in renditions.get(kind, ())
+    }
+
+
+def delete_renditions(renditions, keep=None):
+    keep = _rendition_names(keep or {})
+    for name in _rendition_names(renditions) - keep:
+        default_storage.delete(name)
+
+
+def renditions_match(post):
+    """Whether the recorded renditions were made from the current image."""
+    return post.image_renditions.get('source', '') == post.image.name
+
+
+def needs_renditions(post):
+    if not renditions_match(post):
+        return True
+    return (
+        bool(post.image)
+        and post.image_renditions.get('version') != RENDITIONS_VERSION
+    )
+
+
+def generate_renditions(post_id):
+    """Bring the renditions of a post in line with its current image."""
+    from .models import Post
+    from .page_cache import invalidate_tags
+
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'image_renditions'
+    ).first()
+    if post is None:
+        return
+    previous = post.image_renditions
+    if not needs_renditions(post):
+        return
+    renditions = render_renditions(post.image.name) if post.image else {}
+    # The image may have been replaced meanwhile; that save queues its own
+    # run, so only record renditions that still match.
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        image_renditions=renditions, updated_at=timezone.now()
+    )
+    if not updated:
+        delete_renditions(renditions)
+        return
+    # Regenerating the same image rewrites files under the same names.
+    delete_renditions(previous, keep=renditions)
+    invalidate_tags(f'post:{post_id}')
+
+
+def _generate_in_background(post_id):
+    try:
+        generate_renditions(post_id)
+    except Exception:
+        logger.exception(
+            'Не удалось подготовить копии изображения публикации %s', post_id
+        )
+    finally:
+        connections.close_all()
+
+
+def schedule_renditions(post):
+    """Queue rendition generation for after the current transaction."""
+    post_id = post.pk
+
+    def submit():
+        future = _executor.submit(_generate_in_background, post_id)
+        _pending.add(future)
+        future.add_done_callback(_pending.discard)
+
+    transaction.on_commit(submit)
+
+
+def wait_for_renditions(timeout=None):
+    """Block until the renditions queued so far are written."""
+    wait(list(_pending), timeout)
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Post, make_excerpt
+from blog.page_cache import invalidate_tags
+
+
+class Command(BaseCommand):
+    help = 'Заново вычисляет сохранённые анонсы публикаций для лент.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Сколько публикаций обрабатывать в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = 0
+        processed = changed = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_id)
+                .only('pk', 'text', 'excerpt')
+                .order_by('pk')[:chunk_size]
+            )
+            if not posts:
+                break
+            # A new excerpt changes the feed cards: a new updated_at moves
+            # the ETag and Last-Modified of the feeds.
+            now = timezone.now()
+            stale = []
+            for post in posts:
+                excerpt = make_excerpt(post.text)
+                if post.excerpt != excerpt:
+                    post.excerpt = excerpt
+                    post.updated_at = now
+                    stale.append(post)
+            with transaction.atomic():
+                Post.objects.bulk_update(stale, ['excerpt', 'updated_at'])
+            invalidate_tags(*(f'post:{post.pk}' for post in stale))
+            last_id = posts[-1].pk
+            processed += len(posts)
+            changed += len(stale)
+            self.stdout.write(f'Обработано публикаций: {processed}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Анонсы публикаций обновлены, изменено: {changed}.'
+        ))
@@ -0,0 +1,68 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog import images
+from blog.models import Post
+from blog.page_cache import invalidate_tags
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохраняет размеры и миниатюры-заглушки уже загруженных изображений '
+        'публикаций, обрабатывая файлы в нескольких процессах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Число процессов; по умолчанию по числу ядер.',
+        )
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересчитать и уже заполненные изображения.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['force']:
+            posts = posts.filter(image_width__isnull=True)
+        # Workers only read files; all database work stays in this process.
+        pending = list(posts.order_by('pk').values_list('pk', 'image'))
+
+        processed = failed = 0
+        batch_size = options['batch_size']
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                details = pool.map(
+                    images.describe_stored_image,
+                    [name for _, name in batch],
+                    chunksize=8,
+                )
+                updated = []
+                with transaction.atomic():
+                    for (pk, name), detail in zip(batch, details):
+                        if detail is None:
+                            failed += 1
+                            self.stderr.write(f'{name}: не удалось прочитать')
+                            continue
+                        # Skip posts whose image was replaced meanwhile.
+                        if Post.objects.filter(pk=pk, image=name).update(
+                            updated_at=timezone.now(), **detail
+                        ):
+                            updated.append(pk)
+                invalidate_tags(*(f'post:{pk}' for pk in updated))
+                processed += len(updated)
+                self.stdout.write(f'Обработано изображений: {processed}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: обработано {processed}, с ошибками {failed}.'
+        ))
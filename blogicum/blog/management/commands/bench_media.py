@@ -0,0 +1,112 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.views import static
+
+from blog import media_files
+
+FILE_NAME = 'bench.jpg'
+CHUNK = 1024 * 1024
+
+
+def _drain(sock):
+    while sock.recv(CHUNK):
+        pass
+
+
+def _send_iterated(response, sock):
+    # What a server without wsgi.file_wrapper does: copy through Python.
+    for chunk in response.streaming_content:
+        sock.sendall(chunk)
+    response.close()
+
+
+def _send_file(response, sock):
+    # What gunicorn does with wsgi.file_wrapper: sendfile() from the fd.
+    fileno = response.file_to_stream.fileno()
+    offset = os.lseek(fileno, 0, os.SEEK_CUR)
+    remaining = int(response['Content-Length'])
+    while remaining:
+        sent = os.sendfile(sock.fileno(), fileno, offset, remaining)
+        offset += sent
+        remaining -= sent
+    response.close()
+
+
+def _send_headers_only(response, sock):
+    # The front-end server sends the file; the worker only sends headers.
+    sock.sendall(response.serialize_headers())
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время процессора рабочего процесса на мегабайт при '
+        'отдаче медиафайла: через django.views.static.serve, через '
+        'sendfile() и при передаче файла веб-серверу по X-Accel-Redirect.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=10)
+
+    def handle(self, *args, **options):
+        size_mb = options['size_mb']
+        factory = RequestFactory()
+        request = factory.get(f'/media/{FILE_NAME}')
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, FILE_NAME), 'wb') as file:
+                for _ in range(size_mb):
+                    file.write(os.urandom(CHUNK))
+            cases = {
+                'static.serve': (
+                    partial(
+                        static.serve, request, FILE_NAME, document_root=root
+                    ),
+                    _send_iterated,
+                    {},
+                ),
+                'sendfile': (
+                    partial(media_files.serve, request, FILE_NAME),
+                    _send_file,
+                    {},
+                ),
+                'X-Accel-Redirect': (
+                    partial(media_files.serve, request, FILE_NAME),
+                    _send_headers_only,
+                    {'MEDIA_SENDFILE': 'x-accel-redirect'},
+                ),
+            }
+            for name, (view, send, overrides) in cases.items():
+                with override_settings(MEDIA_ROOT=root, **overrides):
+                    cpu, wall = self._measure(view, send, options)
+                per_mb = options['iterations'] * size_mb
+                self.stdout.write(
+                    f'{name:<18}{cpu / per_mb * 1000:>8.3f} мс CPU/МБ'
+                    f'{wall / per_mb * 1000:>10.3f} мс/МБ всего'
+                )
+
+    @staticmethod
+    def _measure(view, send, options):
+        worker, reader = socket.socketpair()
+        drain = threading.Thread(target=_drain, args=(reader,))
+        drain.start()
+        cpu = wall = 0.0
+        try:
+            for _ in range(options['iterations']):
+                cpu_start = time.thread_time()
+                wall_start = time.perf_counter()
+                send(view(), worker)
+                cpu += time.thread_time() - cpu_start
+                wall += time.perf_counter() - wall_start
+        finally:
+            worker.close()
+            drain.join()
+            reader.close()
+        return cpu, wall
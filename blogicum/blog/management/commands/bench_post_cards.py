@@ -0,0 +1,83 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+from django.test.utils import override_settings
+
+from blog.views import POSTS_ON_PAGE, get_published_posts
+
+BENCH_KEY_PREFIX = 'bench-post-cards'
+FRAGMENT_CACHES = {
+    'без кэша': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'память процесса': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': BENCH_KEY_PREFIX,
+    },
+}
+
+
+def configured_fragment_cache():
+    """The cache ``{% cache %}`` uses with the project settings."""
+    fragment_cache = settings.CACHES.get(
+        'template_fragments', settings.CACHES['default']
+    )
+    # Benchmark entries must not mix with the site's cards.
+    return {**fragment_cache, 'KEY_PREFIX': BENCH_KEY_PREFIX}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время отрисовки карточек публикаций одной страницы '
+        'ленты без кэша фрагментов, с кэшем в памяти процесса и с кэшем '
+        'из настроек проекта.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        posts = list(get_published_posts()[:POSTS_ON_PAGE])
+        if not posts:
+            raise CommandError(
+                'Нет опубликованных публикаций; заполните базу командой '
+                'seed_demo.'
+            )
+        iterations = options['iterations']
+        # Loaded once, as the cached template loader does in production.
+        template = get_template('includes/post_card.html')
+        fragment_caches = {
+            **FRAGMENT_CACHES,
+            'из настроек': configured_fragment_cache(),
+        }
+        results = {}
+        for name, fragment_cache in fragment_caches.items():
+            caches = {
+                **settings.CACHES,
+                'template_fragments': fragment_cache,
+            }
+            with override_settings(CACHES=caches):
+                self._render_page(template, posts)
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    self._render_page(template, posts)
+                results[name] = (time.perf_counter() - start) / iterations
+
+        baseline = results.pop('без кэша')
+        self._report('без кэша', baseline, len(posts))
+        for name, seconds in results.items():
+            self._report(name, seconds, len(posts))
+            self.stdout.write(f'  ускорение: в {baseline / seconds:.1f} раза')
+
+    def _report(self, name, seconds, cards):
+        self.stdout.write(
+            f'{name:<16}{seconds * 1000:>10.2f} мс на страницу '
+            f'({cards} карточек)'
+        )
+
+    @staticmethod
+    def _render_page(template, posts):
+        for post in posts:
+            template.render({'post': post})
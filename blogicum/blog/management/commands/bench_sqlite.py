@@ -0,0 +1,161 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SCHEMA = '''
+CREATE TABLE post (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(256) NOT NULL,
+    text TEXT NOT NULL,
+    pub_date DATETIME NOT NULL,
+    comment_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX post_pub_date ON post (pub_date);
+CREATE TABLE comment (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id INTEGER NOT NULL REFERENCES post (id),
+    text TEXT NOT NULL,
+    created_at DATETIME NOT NULL
+);
+CREATE INDEX comment_post ON comment (post_id, created_at);
+'''
+FEED_QUERY = (
+    'SELECT id, title, pub_date, comment_count FROM post '
+    'ORDER BY pub_date DESC LIMIT 10 OFFSET ?'
+)
+COMMENTS_QUERY = (
+    'SELECT id, text, created_at FROM comment '
+    'WHERE post_id = ? ORDER BY created_at LIMIT 20'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite на чтение и запись '
+        'при смешанной нагрузке с настройками по умолчанию и с '
+        'SQLITE_PRAGMAS из настроек проекта.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--posts', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        profiles = {
+            'по умолчанию': {},
+            'SQLITE_PRAGMAS': getattr(settings, 'SQLITE_PRAGMAS', {}),
+        }
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, pragmas in profiles.items():
+                path = Path(tmp_dir) / f'bench_{len(results)}.sqlite3'
+                self._create_database(path, options['posts'])
+                results[name] = self._run(path, pragmas, options)
+
+        self.stdout.write(
+            f'{"профиль":<16}{"чтений/с":>12}{"записей/с":>12}'
+            f'{"блокировок":>12}'
+        )
+        for name, (reads, writes, locked) in results.items():
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{name:<16}{reads / seconds:>12.0f}'
+                f'{writes / seconds:>12.0f}{locked:>12}'
+            )
+
+    @staticmethod
+    def _connect(path, pragmas):
+        # The same 5 s lock timeout Django's SQLite backend uses by default.
+        connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+        for name, value in pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _create_database(self, path, posts):
+        connection = sqlite3.connect(path)
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            'INSERT INTO post (title, text, pub_date) '
+            "VALUES (?, ?, datetime('now', ?))",
+            (
+                (f'Пост {i}', 'Текст публикации. ' * 50, f'-{i} minutes')
+                for i in range(posts)
+            ),
+        )
+        connection.commit()
+        connection.close()
+
+    def _run(self, path, pragmas, options):
+        self._counters = {'reads': 0, 'writes': 0, 'locked': 0}
+        self._lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+        args = (path, pragmas, deadline, options['posts'])
+        threads = [
+            threading.Thread(target=self._reader, args=(i, *args))
+            for i in range(options['readers'])
+        ] + [
+            threading.Thread(target=self._writer, args=(i, *args))
+            for i in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return (
+            self._counters['reads'],
+            self._counters['writes'],
+            self._counters['locked'],
+        )
+
+    def _count(self, key):
+        with self._lock:
+            self._counters[key] += 1
+
+    def _reader(self, number, path, pragmas, deadline, posts):
+        connection = self._connect(path, pragmas)
+        offset = number
+        while time.monotonic() < deadline:
+            try:
+                connection.execute(FEED_QUERY, (offset % 500,)).fetchall()
+                connection.execute(
+                    COMMENTS_QUERY, (offset % posts + 1,)
+                ).fetchall()
+            except sqlite3.OperationalError:
+                self._count('locked')
+                continue
+            offset += 7
+            self._count('reads')
+        connection.close()
+
+    def _writer(self, number, path, pragmas, deadline, posts):
+        connection = self._connect(path, pragmas)
+        post_id = number
+        while time.monotonic() < deadline:
+            post_id = post_id % posts + 1
+            try:
+                connection.execute('BEGIN')
+                connection.execute(
+                    'INSERT INTO comment (post_id, text, created_at) '
+                    "VALUES (?, 'Комментарий', datetime('now'))",
+                    (post_id,),
+                )
+                connection.execute(
+                    'UPDATE post SET comment_count = comment_count + 1 '
+                    'WHERE id = ?',
+                    (post_id,),
+                )
+                connection.execute('COMMIT')
+            except sqlite3.OperationalError:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                self._count('locked')
+                continue
+            self._count('writes')
+        connection.close()
@@ -0,0 +1,113 @@
+import gzip
+import re
+from pathlib import Path
+
+import django_bootstrap5
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import css_purge
+
+CSS_DIR = settings.BASE_DIR / 'static' / 'css'
+TEMPLATES_DIR = settings.BASE_DIR / 'templates'
+BOOTSTRAP_SOURCE = CSS_DIR / 'bootstrap.min.css'
+SITE_SOURCE = CSS_DIR / 'site.css'
+BOOTSTRAP_OUTPUT = CSS_DIR / 'bootstrap.purged.css'
+CRITICAL_OUTPUT = TEMPLATES_DIR / 'includes' / 'critical_css.html'
+# Markup that is on screen before any scrolling on every page.
+ABOVE_THE_FOLD_TEMPLATES = ('base.html', 'includes/header.html')
+CHARSET_RE = re.compile(r'@charset "[^"]*";')
+HERO_RE = re.compile(r'<section class="forum-hero">.*?</section>', re.S)
+# Classes the code sets outside templates, e.g. Bootstrap form renderers.
+PYTHON_DIRS = (
+    settings.BASE_DIR / 'blog',
+    settings.BASE_DIR / 'pages',
+    Path(django_bootstrap5.__file__).parent,
+)
+
+
+def _above_the_fold_markup():
+    markup = [
+        (TEMPLATES_DIR / name).read_text('utf-8')
+        for name in ABOVE_THE_FOLD_TEMPLATES
+    ]
+    for path in TEMPLATES_DIR.rglob('*.html'):
+        markup += HERO_RE.findall(path.read_text('utf-8'))
+    return '\n'.join(markup)
+
+
+def _size(data):
+    data = data.encode()
+    return len(data), len(gzip.compress(data, compresslevel=9))
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает урезанный Bootstrap только с используемыми в шаблонах '
+        'селекторами и встраиваемый критический CSS для шапки и '
+        'заголовка страницы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help=(
+                'Ничего не записывать, а завершиться с ошибкой, если '
+                'собранные файлы устарели.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        bootstrap = BOOTSTRAP_SOURCE.read_text('utf-8')
+        site = SITE_SOURCE.read_text('utf-8')
+
+        classes = css_purge.used_classes(
+            [TEMPLATES_DIR, Path(django_bootstrap5.__file__).parent],
+            PYTHON_DIRS,
+        )
+        purged = css_purge.purge(bootstrap, classes) + '\n'
+
+        fold_classes, fold_tags = css_purge.markup_classes_and_tags(
+            _above_the_fold_markup()
+        )
+        critical_css = css_purge.purge(
+            bootstrap + site, fold_classes, fold_tags
+        )
+        # @charset is meaningless inside <style>.
+        critical_css = CHARSET_RE.sub('', critical_css)
+        # Included as a template, so braces must not be parsed as tags.
+        critical = (
+            '{% verbatim %}' + critical_css + '{% endverbatim %}\n'
+        )
+
+        outputs = {BOOTSTRAP_OUTPUT: purged, CRITICAL_OUTPUT: critical}
+        if options['check']:
+            stale = [
+                str(path.relative_to(settings.BASE_DIR))
+                for path, content in outputs.items()
+                if not path.exists() or path.read_text('utf-8') != content
+            ]
+            if stale:
+                raise CommandError(
+                    'Файлы устарели, запустите build_css: '
+                    + ', '.join(stale)
+                )
+            return
+        for path, content in outputs.items():
+            path.write_text(content, 'utf-8')
+
+        self._report('Bootstrap', bootstrap, purged)
+        self._report(
+            'Блокирующий CSS', bootstrap + site, critical_css,
+            after_label='встроено',
+        )
+
+    def _report(self, label, before, after, after_label='после'):
+        before_raw, before_gzip = _size(before)
+        after_raw, after_gzip = _size(after)
+        self.stdout.write(
+            f'{label}: было {before_raw / 1024:.1f} КБ '
+            f'({before_gzip / 1024:.1f} КБ gzip), {after_label} '
+            f'{after_raw / 1024:.1f} КБ ({after_gzip / 1024:.1f} КБ gzip)'
+        )
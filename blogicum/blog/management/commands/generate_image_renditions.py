@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from blog import images
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Готовит уменьшенные копии изображений публикаций, для которых их '
+        'ещё нет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии и для уже обработанных изображений.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only(
+            'pk', 'image', 'image_renditions'
+        ).order_by('pk')
+        processed = failed = 0
+        for post in posts.iterator():
+            if options['force']:
+                # Forget the old records so generate_renditions redoes them.
+                Post.objects.filter(pk=post.pk).update(image_renditions={})
+            elif not images.needs_renditions(post):
+                continue
+            try:
+                images.generate_renditions(post.pk)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'{post.image.name}: {error}')
+                continue
+            processed += 1
+            if processed % 100 == 0:
+                self.stdout.write(f'Обработано изображений: {processed}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: обработано {processed}, с ошибками {failed}.'
+        ))
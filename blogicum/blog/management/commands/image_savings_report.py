@@ -0,0 +1,64 @@
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+RENDITION_RE = re.compile(r'^.+_w\d+\.(?P<extension>jpg|webp)$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Считает, сколько байт экономят WebP-копии изображений публикаций '
+        'по сравнению с JPEG-копиями тех же размеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory',
+            default='posts_images',
+            help='Каталог с изображениями относительно MEDIA_ROOT.',
+        )
+
+    def handle(self, *args, **options):
+        root = os.path.join(settings.MEDIA_ROOT, options['directory'])
+        if not os.path.isdir(root):
+            raise CommandError(f'Каталог {root} не найден.')
+        # Bytes per (stem, width) so only widths with both formats count.
+        jpeg, webp = {}, {}
+        originals = original_bytes = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                size = os.path.getsize(path)
+                match = RENDITION_RE.match(filename)
+                if match is None:
+                    originals += 1
+                    original_bytes += size
+                    continue
+                key = os.path.join(directory, filename.rsplit('.', 1)[0])
+                target = jpeg if match['extension'] == 'jpg' else webp
+                target[key] = size
+
+        paired = jpeg.keys() & webp.keys()
+        jpeg_bytes = sum(jpeg[key] for key in paired)
+        webp_bytes = sum(webp[key] for key in paired)
+        saved = jpeg_bytes - webp_bytes
+        share = saved / jpeg_bytes * 100 if jpeg_bytes else 0
+
+        self.stdout.write(
+            f'Оригиналов: {originals}, {_megabytes(original_bytes)}'
+        )
+        self.stdout.write(
+            f'Копий JPEG: {len(paired)}, {_megabytes(jpeg_bytes)}'
+        )
+        self.stdout.write(
+            f'Копий WebP: {len(paired)}, {_megabytes(webp_bytes)}'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'WebP экономит {_megabytes(saved)} ({share:.1f}%).'
+        ))
+
+
+def _megabytes(size):
+    return f'{size / 1024 / 1024:.2f} МБ'
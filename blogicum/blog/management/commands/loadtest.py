@@ -0,0 +1,446 @@
+import http.client
+import json
+import logging
+import math
+import random
+import re
+import secrets
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+)
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer, WSGIRequestHandler
+)
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from blog import demo_data
+from blog.models import Category, Post
+
+User = get_user_model()
+
+DEFAULT_MIX = 'anonymous=70,logged_in=25,comment=5'
+# How reads spread over pages, for both anonymous and logged-in visitors.
+READ_WEIGHTS = {
+    'index': 35,
+    'post_detail': 30,
+    'category_posts': 20,
+    'profile': 15,
+}
+LIST_PAGES = ('index', 'category_posts')
+# Visitors mostly stay on the first pages of a list.
+MAX_PAGE = 5
+PERCENTILES = (50, 95, 99)
+# The ">>" link of a keyset-paginated list, see includes/paginator.html.
+NEXT_CURSOR = re.compile(rb'href="\?cursor=([\w-]+)">\s*>>')
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an ascending list."""
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def parse_mix(value):
+    try:
+        mix = {
+            kind.strip(): float(weight)
+            for kind, weight in (
+                part.split('=') for part in value.split(',') if part
+            )
+        }
+    except ValueError:
+        raise CommandError(f'Неверный формат --mix: {value}')
+    unknown = mix.keys() - {'anonymous', 'logged_in', 'comment'}
+    invalid = [
+        weight for weight in mix.values()
+        if weight < 0 or not math.isfinite(weight)
+    ]
+    if unknown or invalid or not any(mix.values()):
+        raise CommandError(
+            'В --mix допустимы anonymous, logged_in и comment с '
+            'неотрицательными весами.'
+        )
+    return mix
+
+
+def isolated_caches(directory):
+    """Cache settings for a run on the temporary database.
+
+    Seeding bumps the menu, feed count and page tag versions, and pages
+    built from the temporary data would be cached under them: with the
+    site's own cache the real site would then serve them.  Every alias
+    keeps its backend but gets a key prefix of its own, and caches kept
+    in files or in memory move into ``directory``.
+    """
+    prefix = f'loadtest-{secrets.token_hex(8)}'
+    caches = {}
+    for alias, options in settings.CACHES.items():
+        options = {**options, 'KEY_PREFIX': prefix}
+        if options['BACKEND'].endswith(('.FileBasedCache', '.LocMemCache')):
+            options['LOCATION'] = str(Path(directory) / 'cache' / alias)
+        caches[alias] = options
+    return caches
+
+
+class Target:
+    """What the clients request: seeded ids, slugs and user sessions."""
+
+    def __init__(self, clients, paging):
+        self.paging = paging
+        self.post_ids = list(
+            Post.objects.published().values_list('pk', flat=True)
+        )
+        self.category_slugs = list(
+            Category.objects.filter(is_published=True)
+            .values_list('slug', flat=True)
+        )
+        users = list(User.objects.order_by('pk')[:clients])
+        if not self.post_ids or not users:
+            raise CommandError('В базе нет публикаций или пользователей.')
+        self.usernames = [user.username for user in users]
+        self.sessions = [self._session_cookie(user) for user in users]
+
+    @staticmethod
+    def _session_cookie(user):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+    def read_url(self, rng):
+        """``(name, url, pages)`` of the next read.
+
+        With cursor paging a list is opened on its first page and the
+        client follows its "next" link for ``pages - 1`` more pages, as the
+        site's links do; numbered paging jumps to ``?page=N`` instead.
+        """
+        name = rng.choices(
+            list(READ_WEIGHTS), weights=list(READ_WEIGHTS.values())
+        )[0]
+        if name == 'index':
+            url = reverse('blog:index')
+        elif name == 'post_detail':
+            post_id = rng.choice(self.post_ids)
+            url = reverse('blog:post_detail', args=[post_id])
+        elif name == 'category_posts':
+            url = reverse(
+                'blog:category_posts', args=[rng.choice(self.category_slugs)]
+            )
+        else:
+            username = rng.choice(self.usernames)
+            url = reverse('blog:profile', args=[username])
+        if name not in LIST_PAGES:
+            return name, url, 1
+        pages = rng.randint(1, MAX_PAGE)
+        if self.paging == 'page':
+            return name, f"{url}?{urlencode({'page': pages})}", 1
+        return name, url, pages
+
+
+class Client(threading.Thread):
+    def __init__(self, number, target, address, mix, deadline, seed):
+        super().__init__(daemon=True)
+        self.target = target
+        self.address = address
+        self.mix = mix
+        self.deadline = deadline
+        self.rng = random.Random(seed * 1000 + number)
+        self.session = target.sessions[number % len(target.sessions)]
+        # Any 32-character secret works as a CSRF cookie and token.
+        self.csrf_token = secrets.token_hex(16)
+        self.results = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        # Lists being paged through by visitor kind: (name, url, pages).
+        self.browsing = {}
+
+    def run(self):
+        connection = http.client.HTTPConnection(*self.address, timeout=30)
+        kinds, weights = list(self.mix), list(self.mix.values())
+        try:
+            while time.monotonic() < self.deadline:
+                kind = self.rng.choices(kinds, weights=weights)[0]
+                self._request(connection, kind)
+        finally:
+            connection.close()
+
+    def _comment_request(self):
+        post_id = self.rng.choice(self.target.post_ids)
+        body = urlencode({'text': f'Комментарий {self.rng.random()}'})
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Cookie': f'{self.session}; '
+            f'{settings.CSRF_COOKIE_NAME}={self.csrf_token}',
+            'X-CSRFToken': self.csrf_token,
+        }
+        url = reverse('blog:add_comment', args=[post_id])
+        return 'add_comment', 'POST', url, body, headers, 302, None
+
+    def _read_request(self, kind):
+        # A list being paged through continues with the same visitor kind.
+        read = self.browsing.pop(kind, None) or self.target.read_url(
+            self.rng
+        )
+        name, url, _ = read
+        headers = {'Cookie': self.session} if kind == 'logged_in' else {}
+        return name, 'GET', url, None, headers, 200, read
+
+    def _follow_next(self, kind, read, content):
+        name, url, pages = read
+        match = pages > 1 and NEXT_CURSOR.search(content)
+        if match:
+            path = url.split('?', 1)[0]
+            self.browsing[kind] = (
+                name, f'{path}?cursor={match[1].decode()}', pages - 1
+            )
+
+    def _request(self, connection, kind):
+        if kind == 'comment':
+            request = self._comment_request()
+        else:
+            request = self._read_request(kind)
+        name, method, url, body, headers, expected, read = request
+
+        start = time.perf_counter()
+        try:
+            connection.request(method, url, body=body, headers=headers)
+            response = connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            status = None
+        elapsed = time.perf_counter() - start
+        key = f'{kind}:{name}'
+        self.results[key].append(elapsed)
+        self.statuses[key][str(status or 'нет ответа')] += 1
+        if status != expected:
+            self.errors[key] += 1
+        elif read is not None:
+            self._follow_next(kind, read, content)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест: заполняет базу сгенерированными данными, '
+        'поднимает приложение в этом же процессе (или использует '
+        'запущенный сервер) и печатает в JSON пропускную способность и '
+        'задержки p50/p95/p99 по каждому URL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help=(
+                'Адрес уже запущенного сервера, например '
+                'http://127.0.0.1:8000. Сервер должен работать с той же '
+                'базой, что и команда. По умолчанию приложение поднимается '
+                'в этом процессе на временной базе SQLite.'
+            ),
+        )
+        parser.add_argument(
+            '--populate',
+            action='store_true',
+            help='С --url: добавить сгенерированные данные в текущую базу.',
+        )
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--clients', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--mix', default=DEFAULT_MIX)
+        parser.add_argument(
+            '--paging',
+            choices=('cursor', 'page'),
+            default='cursor',
+            help=(
+                'cursor (по умолчанию): открывать ленты с первой страницы и '
+                'идти дальше по ссылкам ?cursor=, как посетители сайта; '
+                'page: запрашивать ?page=N, старые нумерованные страницы.'
+            ),
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Куда ещё записать JSON.')
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        # Per-request query logging would drown the report and slow the run.
+        query_log = logging.getLogger('blog.queries')
+        level = query_log.level
+        query_log.setLevel(logging.WARNING)
+        try:
+            report = self._load_test(options, mix)
+        finally:
+            query_log.setLevel(level)
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n', 'utf-8')
+        self.stdout.write(output)
+
+    def _load_test(self, options, mix):
+        if options['url']:
+            if options['populate']:
+                self._populate(options)
+            report = self._run(options, mix, self._address(options['url']))
+        else:
+            with self._temporary_database():
+                self._populate(options)
+                with self._in_process_server() as address:
+                    report = self._run(options, mix, address)
+        return report
+
+    @staticmethod
+    def _address(url):
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise CommandError('--url должен быть вида http://host:port.')
+        return parts.hostname, parts.port or 80
+
+    def _populate(self, options):
+        start = time.perf_counter()
+        demo_data.seed_bulk(
+            users=options['users'],
+            posts=options['posts'],
+            comments=options['comments'],
+            categories=demo_data.CATEGORIES,
+            seed=options['seed'],
+        )
+        self.stderr.write(
+            f'Данные созданы за {time.perf_counter() - start:.1f} с.'
+        )
+
+    @contextmanager
+    def _temporary_database(self):
+        connection = connections['default']
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                'Временная база поддерживается только для SQLite; '
+                'запустите сервер сами и передайте --url.'
+            )
+        original_name = connection.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            connection.close()
+            # The dict is shared, so server threads connect here too.
+            connection.settings_dict['NAME'] = str(
+                Path(directory) / 'loadtest.sqlite3'
+            )
+            try:
+                with override_settings(CACHES=isolated_caches(directory)):
+                    call_command('migrate', verbosity=0, interactive=False)
+                    yield
+            finally:
+                connections.close_all()
+                connection.settings_dict['NAME'] = original_name
+
+    @contextmanager
+    def _in_process_server(self):
+        server = ThreadedWSGIServer(
+            ('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False
+        )
+        # Not get_wsgi_application(): setting Django up again would
+        # reconfigure logging.
+        server.set_app(WSGIHandler())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield server.server_address
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def _run(self, options, mix, address):
+        target = Target(options['clients'], options['paging'])
+        started = time.monotonic()
+        clients = [
+            Client(
+                number,
+                target,
+                address,
+                mix,
+                started + options['duration'],
+                options['seed'],
+            )
+            for number in range(options['clients'])
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.monotonic() - started
+        return self._report(options, mix, address, clients, elapsed)
+
+    @staticmethod
+    def _report(options, mix, address, clients, elapsed):
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        statuses = defaultdict(lambda: defaultdict(int))
+        for client in clients:
+            for key, values in client.results.items():
+                latencies[key].extend(values)
+            for key, count in client.errors.items():
+                errors[key] += count
+            for key, counts in client.statuses.items():
+                for status, count in counts.items():
+                    statuses[key][status] += count
+
+        urls = {}
+        for key in sorted(latencies):
+            values = sorted(latencies[key])
+            urls[key] = {
+                'requests': len(values),
+                'errors': errors[key],
+                'throughput_rps': round(len(values) / elapsed, 2),
+                'mean_ms': round(sum(values) / len(values) * 1000, 2),
+                **{
+                    f'p{percent}_ms': round(
+                        percentile(values, percent) * 1000, 2
+                    )
+                    for percent in PERCENTILES
+                },
+                'max_ms': round(values[-1] * 1000, 2),
+                'statuses': dict(sorted(statuses[key].items())),
+            }
+        total = sum(url['requests'] for url in urls.values())
+        return {
+            'target': options['url'] or 'in-process',
+            'address': f'{address[0]}:{address[1]}',
+            'clients': options['clients'],
+            'duration_s': round(elapsed, 2),
+            'mix': mix,
+            'paging': options['paging'],
+            'seed': options['seed'],
+            'data': {
+                'users': options['users'],
+                'posts': options['posts'],
+                'comments': options['comments'],
+            },
+            'total': {
+                'requests': total,
+                'errors': sum(errors.values()),
+                'throughput_rps': round(total / elapsed, 2),
+            },
+            'urls': urls,
+        }
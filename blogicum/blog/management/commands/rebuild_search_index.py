@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает полнотекстовый индекс публикаций и комментариев '
+        'из исходных таблиц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.is_available(using):
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только для SQLite.'
+            )
+        connection = connections[using]
+        with transaction.atomic(using=using):
+            search.install(connection)
+            search.rebuild(connection)
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс пересобран.'))
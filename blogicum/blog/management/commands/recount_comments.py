@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.page_cache import invalidate_tags
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько публикаций пересчитывать в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        counts = (
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        actual = Coalesce(Subquery(counts), 0)
+        last_id = 0
+        processed = fixed = 0
+        while True:
+            ids = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                # Only posts with a wrong count change: they get a new
+                # updated_at, so the ETag and Last-Modified move too.
+                changed = list(
+                    Post.objects.filter(pk__gte=ids[0], pk__lte=ids[-1])
+                    .annotate(actual=actual)
+                    .exclude(comment_count=F('actual'))
+                    .values_list('pk', flat=True)
+                )
+                Post.objects.filter(pk__in=changed).update(
+                    comment_count=actual, updated_at=timezone.now()
+                )
+            invalidate_tags(*(f'post:{pk}' for pk in changed))
+            last_id = ids[-1]
+            processed += len(ids)
+            fixed += len(changed)
+            self.stdout.write(f'Пересчитано публикаций: {processed}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики комментариев обновлены, исправлено: {fixed}.'
+        ))
@@ -1,22 +1,32 @@
+import time
 from datetime import timedelta
+from functools import partial
 from pathlib import Path
 from shutil import rmtree
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
+from blog import demo_data
+from blog.fetch_cache import DEFAULT_WORKERS, FetchCache, fetch_all
 from blog.models import Category, Comment, Location, Post
 
 User = get_user_model()
 
+# Bump on any change to the demo records below: start_demo snapshots are
+# keyed by it.
+DEMO_DATA_VERSION = 1
+# Connect and read timeouts: a dead host fails fast, a slow one gets time.
+FETCH_TIMEOUT = (5, 20)
+IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp'}
+
 HABR_POSTS = [
     {
         'title': 'Cloud.ru: как выбирать архитектуру форм в React/Angular',
@@ -98,25 +108,105 @@ class Command(BaseCommand):
             action='store_true',
             help='Не очищать существующие данные перед заполнением.',
         )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help=(
+                'Не обращаться к сети: брать изображения только из кэша, '
+                'остальным публикациям поставить логотип.'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Сколько страниц и изображений загружать одновременно.',
+        )
+        bulk = parser.add_argument_group(
+            'сгенерированные данные',
+            'Добавляются к демо-записям пачками через bulk_create.',
+        )
+        bulk.add_argument('--users', type=int, default=0)
+        bulk.add_argument('--posts', type=int, default=0)
+        bulk.add_argument(
+            '--comments',
+            type=int,
+            default=0,
+            help='Распределяются по новым публикациям по закону Ципфа.',
+        )
+        bulk.add_argument('--categories', type=int, default=0)
+        bulk.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Одинаковое значение даёт одинаковые данные.',
+        )
+        bulk.add_argument(
+            '--chunk-size',
+            type=int,
+            default=demo_data.CHUNK_SIZE,
+            help='Сколько строк записывать в одной транзакции.',
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
-        keep_existing = options['keep']
-        if not keep_existing:
-            self._clear_data()
+        if options['comments'] and not options['posts']:
+            raise CommandError('--comments требует --posts.')
+        # Downloads happen before the transaction, not while holding it.
+        images = self._fetch_images(HABR_POSTS, options)
+        with transaction.atomic():
+            if not options['keep']:
+                self._clear_data()
 
-        users = self._create_users()
-        categories = self._create_categories()
-        locations = self._create_locations()
-        posts = self._create_posts(users, categories, locations)
-        self._create_comments(posts, users)
+            users = self._create_users()
+            categories = self._create_categories()
+            locations = self._create_locations()
+            posts = self._create_posts(users, categories, locations, images)
+            self._create_comments(posts, users)
 
+        self._generate(options)
         self.stdout.write(self.style.SUCCESS('Демо-данные успешно заполнены.'))
         self.stdout.write(
             'Аккаунты: admin/admin12345, marta/marta12345, '
             'maksim/maksim12345, olga/olga12345'
         )
 
+    def _generate(self, options):
+        counts = {
+            name: options[name]
+            for name in ('users', 'posts', 'comments', 'categories')
+        }
+        if not any(counts.values()):
+            return
+        start = time.perf_counter()
+        reported = {}
+
+        def progress(label, done, total):
+            # Every tenth part is enough to see that it is moving.
+            step = done * 10 // total
+            if reported.get(label) == step:
+                return
+            reported[label] = step
+            self.stdout.write(
+                f'{label}: {done}/{total} '
+                f'({time.perf_counter() - start:.1f} с)'
+            )
+
+        demo_data.seed_bulk(
+            **counts,
+            seed=options['seed'],
+            chunk_size=options['chunk_size'],
+            progress=progress,
+        )
+        self.stdout.write(
+            f'Сгенерировано за {time.perf_counter() - start:.1f} с: '
+            f'пользователей {counts["users"]}, '
+            f'категорий {counts["categories"]}, '
+            f'публикаций {counts["posts"]}, '
+            f'комментариев {counts["comments"]}. '
+            f'Пароль пользователей {demo_data.USERNAME_PREFIX}*: '
+            f'{demo_data.PASSWORD}'
+        )
+
     def _clear_data(self):
         Comment.objects.all().delete()
         Post.objects.all().delete()
@@ -196,7 +286,7 @@ class Command(BaseCommand):
             'Новосибирск': self._get_location('Новосибирск'),
         }
 
-    def _create_posts(self, users, categories, locations):
+    def _create_posts(self, users, categories, locations, images):
         now = timezone.now()
         posts_data = list(HABR_POSTS)
         posts_data.extend(
@@ -282,12 +372,8 @@ class Command(BaseCommand):
                 location=locations[post_data['location']],
                 is_published=post_data.get('is_published', True),
             )
-            image_url = post_data.get('image_url')
-            article_url = post_data.get('article_url')
-            if not image_url and article_url:
-                image_url = self._extract_og_image(article_url)
-            if image_url:
-                self._attach_remote_image(post, image_url, index)
+            if post_data.get('image_url') or post_data.get('article_url'):
+                self._attach_image(post, images.get(post.title), index)
             created_posts.append(post)
         return created_posts
 
@@ -318,50 +404,87 @@ class Command(BaseCommand):
                 ),
             )
 
-    @staticmethod
-    def _attach_remote_image(post, image_url, index):
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        content = None
-        try:
-            request = Request(image_url, headers=headers)
-            with urlopen(request, timeout=20) as response:
-                content = response.read()
-        except (HTTPError, URLError, TimeoutError):
-            pass
+    def _fetch_images(self, posts_data, options):
+        """``{title: (content, extension)}`` of the posts' images.
 
-        if content is None:
-            logo_path = Path(settings.BASE_DIR) / 'static' / 'img' / 'logo.png'
-            if logo_path.exists():
-                content = logo_path.read_bytes()
-                ext = 'png'
-            else:
-                return
-        else:
-            ext = image_url.split('?')[0].rsplit('.', 1)[-1].lower()
-            if ext not in {'jpg', 'jpeg', 'png', 'webp'}:
-                ext = 'jpg'
+        Article pages are fetched only for posts without an image URL, to
+        read their ``og:image``.  Everything goes through the on-disk
+        cache, so later runs and ``--offline`` runs need no network.
+        """
+        cache = FetchCache(settings.DEMO_CACHE_DIR)
+        with requests.Session() as session:
+            adapter = HTTPAdapter(
+                pool_maxsize=options['workers']
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = 'Mozilla/5.0'
+            fetch = partial(
+                fetch_all,
+                fetch=partial(self._download, session),
+                cache=cache,
+                offline=options['offline'],
+                workers=options['workers'],
+            )
+            pages = fetch(
+                post_data['article_url'] for post_data in posts_data
+                if post_data.get('article_url')
+                and not post_data.get('image_url')
+            )
+            image_urls = {}
+            for post_data in posts_data:
+                image_url = post_data.get('image_url') or self._og_image(
+                    pages.get(post_data.get('article_url'))
+                )
+                if image_url:
+                    image_urls[post_data['title']] = image_url
+            contents = fetch(image_urls.values())
 
-        filename = f'habr_post_{index}.{ext}'
-        post.image.save(filename, ContentFile(content), save=True)
+        images = {
+            title: (contents[url], self._extension(url))
+            for title, url in image_urls.items()
+            if contents[url] is not None
+        }
+        self.stdout.write(
+            f'Изображений получено: {len(images)} из {len(posts_data)}.'
+        )
+        return images
 
     @staticmethod
-    def _extract_og_image(article_url):
+    def _download(session, url):
         try:
-            response = requests.get(
-                article_url,
-                timeout=20,
-                headers={'User-Agent': 'Mozilla/5.0'},
-            )
+            response = session.get(url, timeout=FETCH_TIMEOUT)
             response.raise_for_status()
         except requests.RequestException:
             return None
+        return response.content
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+    @staticmethod
+    def _og_image(page):
+        if page is None:
+            return None
+        soup = BeautifulSoup(page, 'html.parser')
         meta = soup.find('meta', property='og:image')
         if not meta:
             return None
         return meta.get('content')
 
+    @staticmethod
+    def _extension(image_url):
+        ext = image_url.split('?')[0].rsplit('.', 1)[-1].lower()
+        return ext if ext in IMAGE_EXTENSIONS else 'jpg'
+
+    @staticmethod
+    def _attach_image(post, image, index):
+        if image is None:
+            logo_path = Path(settings.BASE_DIR) / 'static' / 'img' / 'logo.png'
+            if not logo_path.exists():
+                return
+            image = (logo_path.read_bytes(), 'png')
+        content, ext = image
+        filename = f'habr_post_{index}.{ext}'
+        post.image.save(filename, ContentFile(content), save=True)
+
     @staticmethod
     def _create_user(username, password, **extra_fields):
         user, _ = User.objects.get_or_create(username=username)
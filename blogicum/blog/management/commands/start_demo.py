@@ -1,9 +1,21 @@
+import os
+import time
+
+from django.conf import settings
 from django.core.management import BaseCommand, call_command
+from django.db import connections
+from django.utils.autoreload import DJANGO_AUTORELOAD_ENV
+
+from blog import demo_snapshot, images
+from blog.management.commands import seed_demo
 
 
 class Command(BaseCommand):
     help = (
-        'Запускает проект одной командой: migrate, seed_demo, runserver.'
+        'Запускает проект одной командой: migrate, seed_demo, runserver. '
+        'Свежие демо-данные сохраняются снимком и при следующих запусках '
+        'восстанавливаются из него в тот же день, пока не изменились '
+        'миграции, код моделей и версия демо-данных.'
     )
 
     def add_arguments(self, parser):
@@ -17,26 +29,69 @@ class Command(BaseCommand):
             action='store_true',
             help='Не очищать и не пересоздавать демо-данные.',
         )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Брать изображения демо-публикаций только из кэша.',
+        )
+        parser.add_argument(
+            '--reseed',
+            action='store_true',
+            help='Заполнить демо-данные заново, не используя снимок.',
+        )
 
     def handle(self, *args, **options):
         addrport = options['addrport']
-        keep_data = options['keep_data']
+        # The autoreloader runs this command again in the server process;
+        # the data is already in place by then.
+        if os.environ.get(DJANGO_AUTORELOAD_ENV) != 'true':
+            self._prepare_data(options)
 
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Сервер запущен: http://{addrport}/ '
+                '(Ctrl+C для остановки).'
+            )
+        )
+        call_command('runserver', addrport)
+
+    def _prepare_data(self, options):
+        connection = connections['default']
+        if options['keep_data'] or connection.vendor != 'sqlite':
+            self._migrate_and_seed(options)
+            return
+
+        start = time.perf_counter()
+        snapshot = demo_snapshot.snapshot_dir(
+            demo_snapshot.snapshot_key(
+                seed_demo.DEMO_DATA_VERSION, options['offline']
+            )
+        )
+        connections.close_all()
+        database = connection.settings_dict['NAME']
+        if not options['reseed'] and demo_snapshot.restore(
+            snapshot, database, settings.MEDIA_ROOT
+        ):
+            self.stdout.write(self.style.NOTICE(
+                'Демо-данные восстановлены из снимка за '
+                f'{time.perf_counter() - start:.2f} с.'
+            ))
+            return
+
+        self._migrate_and_seed(options)
+        images.wait_for_renditions()
+        connections.close_all()
+        demo_snapshot.save(snapshot, database, settings.MEDIA_ROOT)
+        self.stdout.write(self.style.NOTICE('Снимок демо-данных сохранён.'))
+
+    def _migrate_and_seed(self, options):
         self.stdout.write(self.style.NOTICE('Применяю миграции...'))
         call_command('migrate')
 
-        if not keep_data:
+        if not options['keep_data']:
             self.stdout.write(self.style.NOTICE('Заполняю демо-данные...'))
-            call_command('seed_demo')
+            call_command('seed_demo', offline=options['offline'])
         else:
             self.stdout.write(
                 self.style.NOTICE('Демо-данные сохранены без изменений.')
             )
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'Сервер запущен: http://{addrport}/ '
-                '(Ctrl+C для остановки).'
-            )
-        )
-        call_command('runserver', addrport)
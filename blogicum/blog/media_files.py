@@ -0,0 +1,174 @@
+"""Serving ``MEDIA_ROOT`` with ranges, validators and sendfile offload.
+
+Files are handed to the WSGI server as file objects, so servers with
+``wsgi.file_wrapper`` (gunicorn, uWSGI) send them with ``sendfile()``
+without copying them through Python.  With ``MEDIA_SENDFILE`` set, only
+headers are produced and the front-end server sends the file itself.
+"""
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import (
+    ImproperlyConfigured, SuspiciousFileOperation
+)
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+MEDIA_MAX_AGE = 60 * 60 * 24
+SENDFILE_HEADERS = {
+    'x-accel-redirect': 'X-Accel-Redirect',
+    'x-sendfile': 'X-Sendfile',
+}
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """Read-only view of ``length`` bytes of an open file from ``start``.
+
+    ``fileno()`` is kept so sendfile-capable servers still use it; they
+    send no more than the ``Content-Length`` of the response.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """``(start, end)`` of a single ``bytes=`` range, inclusive.
+
+    Returns ``None`` when the whole file should be sent: no header, a
+    malformed one or several ranges, which servers may ignore.
+    """
+    unit, _, ranges = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+    first, dash, last = ranges.strip().partition('-')
+    if not dash or not (first or last):
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes.
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag, mtime):
+    if_range = request.headers.get('If-Range')
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        # Only strong validators may be used with If-Range.
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _offload(path, full_path):
+    mode = settings.MEDIA_SENDFILE
+    header = SENDFILE_HEADERS.get(mode)
+    if header is None:
+        raise ImproperlyConfigured(
+            f'MEDIA_SENDFILE должен быть одним из {sorted(SENDFILE_HEADERS)}.'
+        )
+    response = HttpResponse()
+    if mode == 'x-accel-redirect':
+        location = settings.MEDIA_ACCEL_REDIRECT_LOCATION.rstrip('/')
+        response[header] = f'{location}/{path}'
+    else:
+        response[header] = full_path
+    return response
+
+
+def _file_response(request, full_path, stat, etag):
+    """Full or partial response streaming the file from disk."""
+    size = stat.st_size
+    byte_range = None
+    if 'Range' in request.headers and _if_range_matches(
+        request, etag, stat.st_mtime
+    ):
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file)
+        response['Content-Length'] = size
+        return response
+    start, end = byte_range
+    response = FileResponse(FileRange(file, start, end - start + 1))
+    response.status_code = 206
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+def serve(request, path):
+    """Serve a file from ``MEDIA_ROOT``."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден.')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Файл не найден.')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден.')
+
+    etag = file_etag(stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        if settings.MEDIA_SENDFILE:
+            response = _offload(path, full_path)
+        else:
+            response = _file_response(request, full_path, stat, etag)
+    content_type, encoding = mimetypes.guess_type(posixpath.basename(path))
+    if response.status_code in (200, 206):
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = f'public, max-age={MEDIA_MAX_AGE}'
+    return response
@@ -0,0 +1,61 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+logger = logging.getLogger('blog.queries')
+
+
+class QueryStats:
+    """``execute_wrapper`` that counts and times every executed statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.total_time += duration
+            if duration >= self.slowest_time:
+                self.slowest_time = duration
+                self.slowest_sql = sql
+
+
+class QueryStatsMiddleware:
+    """Report query count, SQL time and the slowest statement per request.
+
+    The numbers go to the ``X-Query-Count``/``X-Query-Time`` response
+    headers and to the ``blog.queries`` logger.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+
+        total_ms = stats.total_time * 1000
+        response['X-Query-Count'] = str(stats.count)
+        response['X-Query-Time'] = f'{total_ms:.1f}ms'
+        logger.info(
+            '%s %s: %d queries in %.1fms, slowest %.1fms: %s',
+            request.method,
+            request.get_full_path(),
+            stats.count,
+            total_ms,
+            stats.slowest_time * 1000,
+            stats.slowest_sql,
+        )
+        return response
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:39
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 512
+
+
+def make_excerpt(text):
+    # Frozen copy of blog.models.make_excerpt as of this migration:
+    # Truncator(text).words(10, truncate=' …'), then .chars(512).
+    words = text.split()
+    excerpt = ' '.join(words[:EXCERPT_WORDS])
+    if len(words) > EXCERPT_WORDS:
+        excerpt += ' …'
+    if len(excerpt) > EXCERPT_MAX_LENGTH:
+        excerpt = excerpt[:EXCERPT_MAX_LENGTH - 1] + '…'
+    return excerpt
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('pk', 'text').iterator(CHUNK_SIZE):
+        post.excerpt = make_excerpt(post.text)
+        batch.append(post)
+        if len(batch) == CHUNK_SIZE:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=512, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:40
+
+from django.db import migrations, models
+from django.utils.html import escape
+from django.utils.text import normalize_newlines
+
+CHUNK_SIZE = 1000
+
+
+def render_text(text):
+    # Frozen copy of blog.models.render_text as of this migration:
+    # what {{ text|linebreaksbr }} renders with autoescape.
+    return escape(normalize_newlines(text)).replace('\n', '<br>')
+
+
+def fill_text_html(apps, schema_editor):
+    for model_name in ('Post', 'Comment'):
+        model = apps.get_model('blog', model_name)
+        batch = []
+        for obj in model.objects.only('pk', 'text').iterator(CHUNK_SIZE):
+            obj.text_html = render_text(obj.text)
+            batch.append(obj)
+            if len(batch) == CHUNK_SIZE:
+                model.objects.bulk_update(batch, ['text_html'])
+                batch = []
+        model.objects.bulk_update(batch, ['text_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст комментария в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_text_html, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:46
+
+import blog.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_search_index(apps, schema_editor):
+    blog.search.install(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    blog.search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_text_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentSearchEntry',
+            fields=[
+                ('comment', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='blog.comment')),
+                ('text', models.TextField()),
+                ('document', blog.search.FullTextField(db_column='blog_comment_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'blog_comment_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PostSearchEntry',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='blog.post')),
+                ('title', models.TextField()),
+                ('text', models.TextField()),
+                ('document', blog.search.FullTextField(db_column='blog_post_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'blog_post_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
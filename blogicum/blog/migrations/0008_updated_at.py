@@ -0,0 +1,49 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:56
+
+from django.db import migrations, models
+
+
+def fill_updated_at(apps, schema_editor):
+    # Rows have not changed since they were created as far as we know.
+    for model_name in ('Category', 'Location', 'Post', 'Comment'):
+        model = apps.get_model('blog', model_name)
+        model.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'updated_at'], name='comment_post_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated_at'], name='post_updated_idx'),
+        ),
+    ]
@@ -1,9 +1,48 @@
+import hashlib
+
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.db import models
+from django.template.defaultfilters import linebreaksbr
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from . import images, search
 
 User = get_user_model()
 
 IS_PUBLISHED_HELP_TEXT = 'Снимите галочку, чтобы скрыть публикацию.'
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 512
+# Base64 of a 16px WebP preview stays well under this.
+PLACEHOLDER_MAX_LENGTH = 2048
+
+
+def make_excerpt(text):
+    """Same text as ``{{ text|truncatewords:10 }}`` renders in feeds."""
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    return Truncator(excerpt).chars(EXCERPT_MAX_LENGTH)
+
+
+def render_text(text):
+    """Same HTML as ``{{ text|linebreaksbr }}`` renders with autoescape."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def refresh_text_html(instance, save_kwargs, *derived_fields):
+    """Fill ``text_html`` (and ``derived_fields``) before ``save()``.
+
+    Skipped when ``text`` is deferred; ``update_fields`` that touch the text
+    are extended so the derived columns are written along with it.
+    """
+    if 'text' in instance.get_deferred_fields():
+        return
+    instance.text_html = render_text(instance.text)
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None and 'text' in update_fields:
+        save_kwargs['update_fields'] = {
+            *update_fields, 'text_html', *derived_fields,
+        }
 
 
 class PublishedCreatedModel(models.Model):
@@ -13,6 +52,7 @@ class PublishedCreatedModel(models.Model):
         help_text=IS_PUBLISHED_HELP_TEXT,
     )
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         abstract = True
@@ -49,6 +89,60 @@ class Location(PublishedCreatedModel):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(self._published_q())
+
+    def visible_to(self, user):
+        """Published posts plus every post of ``user`` themselves."""
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(self._published_q() | models.Q(author=user))
+
+    def search(self, query):
+        """Posts whose text or discussion matches ``query``.
+
+        Posts matching in the title or text come first, by bm25; posts
+        found only through their comments follow, newest first.
+        """
+        expression = search.match_expression(query)
+        if expression is None:
+            return self.none()
+        if not search.is_available(self.db):
+            return self.filter(
+                models.Q(title__icontains=query)
+                | models.Q(text__icontains=query)
+                | models.Q(comments__text__icontains=query)
+            ).distinct()
+        post_entries = PostSearchEntry.objects.filter(
+            document__match=expression
+        )
+        commented = CommentSearchEntry.objects.filter(
+            document__match=expression
+        ).values('comment__post_id')
+        return self.filter(
+            models.Q(pk__in=post_entries.values('pk'))
+            | models.Q(pk__in=commented)
+        ).annotate(
+            search_rank=models.Subquery(
+                post_entries.filter(pk=models.OuterRef('pk')).values('rank')
+            ),
+        ).order_by(
+            models.F('search_rank').asc(nulls_last=True), '-pub_date'
+        )
+
+    def with_feed_relations(self):
+        return self.select_related('author', 'category', 'location')
+
+    @staticmethod
+    def _published_q():
+        return models.Q(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            category__is_published=True,
+        )
+
+
 class Post(PublishedCreatedModel):
     title = models.CharField('Заголовок', max_length=256)
     text = models.TextField('Текст')
@@ -83,15 +177,154 @@ class Post(PublishedCreatedModel):
         upload_to='posts_images',
         blank=True,
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    excerpt = models.CharField(
+        'Анонс',
+        max_length=EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False,
+    )
+    text_html = models.TextField('Текст в HTML', blank=True, editable=False)
+    image_width = models.PositiveIntegerField(
+        'Ширина изображения', null=True, blank=True, editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота изображения', null=True, blank=True, editable=False
+    )
+    image_placeholder = models.CharField(
+        'Миниатюра-заглушка',
+        max_length=PLACEHOLDER_MAX_LENGTH,
+        blank=True,
+        editable=False,
+    )
+    image_renditions = models.JSONField(
+        'Уменьшенные копии изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(fields=('updated_at',), name='post_updated_idx'),
+        )
 
     def __str__(self):
         return self.title
 
+    @property
+    def card_version(self):
+        """Fingerprint of everything ``includes/post_card.html`` shows.
+
+        Used as the fragment cache key, so a changed post, category,
+        location, author name or comment count renders a fresh card.
+        """
+        category, location = self.category, self.location
+        parts = (
+            self.title,
+            self.excerpt,
+            self.pub_date.isoformat(),
+            self.is_published,
+            self.image.name,
+            self.image_srcset,
+            self.image_webp_srcset,
+            self.image_width,
+            self.image_height,
+            self.image_placeholder,
+            self.comment_count,
+            self.author.username,
+            category and (
+                category.slug, category.title, category.is_published
+            ),
+            location and (location.name, location.is_published),
+        )
+        return hashlib.md5(repr(parts).encode()).hexdigest()
+
+    def _current_renditions(self, kind='jpeg'):
+        if not images.renditions_match(self):
+            # Not generated yet for this image.
+            return []
+        return self.image_renditions.get(kind, [])
+
+    def _srcset(self, kind):
+        return ', '.join(
+            f"{default_storage.url(rendition['name'])} {rendition['width']}w"
+            for rendition in self._current_renditions(kind)
+        )
+
+    def _image_url(self, width):
+        """Smallest rendition at least ``width`` wide, else the original."""
+        for rendition in self._current_renditions():
+            if rendition['width'] >= width:
+                return default_storage.url(rendition['name'])
+        return self.image.url
+
+    @property
+    def image_srcset(self):
+        return self._srcset('jpeg')
+
+    @property
+    def image_webp_srcset(self):
+        return self._srcset('webp')
+
+    @property
+    def card_image_url(self):
+        return self._image_url(images.CARD_WIDTH)
+
+    @property
+    def detail_image_url(self):
+        return self._image_url(images.DETAIL_WIDTH)
+
+    @property
+    def image_sizes(self):
+        return images.IMAGE_SIZES
+
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+        refresh_text_html(self, kwargs, 'excerpt')
+        images.refresh_image_details(self, kwargs)
+        if not (
+            self._state.adding
+            or self.pk is None
+            or kwargs.get('force_insert')
+            or kwargs.get('update_fields') is not None
+        ):
+            # comment_count is moved by F() updates from the comment
+            # signals; writing back the value loaded earlier would undo
+            # comments added or deleted meanwhile.
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name != 'comment_count'
+            ]
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -105,10 +338,69 @@ class Comment(models.Model):
         related_name='comments',
     )
     text = models.TextField('Текст комментария')
+    text_html = models.TextField(
+        'Текст комментария в HTML',
+        blank=True,
+        editable=False,
+    )
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+            models.Index(
+                fields=('post', 'updated_at'),
+                name='comment_post_updated_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def save(self, *args, **kwargs):
+        refresh_text_html(self, kwargs)
+        super().save(*args, **kwargs)
+
+
+class PostSearchEntry(models.Model):
+    """Row of the ``blog_post_fts`` full-text index, see ``blog.search``."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_entry',
+    )
+    title = models.TextField()
+    text = models.TextField()
+    document = search.FullTextField(db_column='blog_post_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_fts'
+
+
+class CommentSearchEntry(models.Model):
+    """Row of the ``blog_comment_fts`` full-text index."""
+
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_entry',
+    )
+    text = models.TextField()
+    document = search.FullTextField(db_column='blog_comment_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_comment_fts'
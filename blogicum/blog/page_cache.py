@@ -0,0 +1,146 @@
+"""Whole-page cache for anonymous visitors with tag-based invalidation.
+
+A cached page remembers the version of every tag it was built from
+(``post:<id>``, ``author:<id>``, ``category:<id>``, ``location:<id>``,
+``feed`` and ``menu``).  Model signals bump the versions of the tags a
+change touches, and a page whose tags no longer match is rebuilt.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+PAGE_KEY_PREFIX = 'blog:page'
+TAG_KEY_PREFIX = 'blog:page-tag'
+# Scheduled posts go live without a save, so pages must also expire.
+PAGE_CACHE_TIMEOUT = 60 * 5
+# Every page shows the category menu in its header.
+DEFAULT_TAGS = ('menu',)
+
+
+def _tag_key(tag):
+    return f'{TAG_KEY_PREFIX}:{tag}'
+
+
+def _new_version():
+    # Never restart from a fixed number after the key is evicted.
+    return time.time_ns()
+
+
+def invalidate_tags(*tags):
+    for tag in set(tags):
+        try:
+            cache.incr(_tag_key(tag))
+        except ValueError:
+            cache.set(_tag_key(tag), _new_version(), None)
+
+
+def tag_versions(tags):
+    keys = {_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, _new_version(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def add_page_tags(request, *tags):
+    """Record what the page being built depends on; no-op if not cached.
+
+    The versions are read right away, so a view tags the page before it
+    queries the data a tag guards: a change saved while the page is being
+    built then makes the stored page outdated instead of going unnoticed.
+    """
+    page_tags = getattr(request, 'page_cache_tags', None)
+    if page_tags is None:
+        return
+    new_tags = [tag for tag in tags if tag not in page_tags]
+    if new_tags:
+        page_tags.update(tag_versions(new_tags))
+
+
+def post_tags(posts):
+    """Tags for a list of posts rendered with their author and location."""
+    tags = set()
+    for post in posts:
+        tags.add(f'post:{post.pk}')
+        tags.add(f'author:{post.author_id}')
+        if post.location_id is not None:
+            tags.add(f'location:{post.location_id}')
+    return tags
+
+
+def _is_cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def _get_cached(key):
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    current = cache.get_many([_tag_key(tag) for tag in entry['tags']])
+    for tag, version in entry['tags'].items():
+        if current.get(_tag_key(tag)) != version:
+            return None
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        response[header] = value
+    return response
+
+
+def _store(key, request, response):
+    if (
+        response.status_code != 200
+        or response.streaming
+        or response.cookies
+        or request.META.get('CSRF_COOKIE_USED')
+    ):
+        return
+    entry = {
+        'content': response.content,
+        'status': response.status_code,
+        'headers': list(response.items()),
+        'tags': request.page_cache_tags,
+    }
+    cache.set(key, entry, PAGE_CACHE_TIMEOUT)
+
+
+def anonymous_page_cache(view):
+    """Serve anonymous GETs from the cache, keyed by the full URL.
+
+    The view tags the page with ``add_page_tags()``; logged-in users and
+    other methods always get a freshly built page.  Conditional requests
+    are answered from the ETag/Last-Modified stored with the page.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _is_cacheable(request):
+            return view(request, *args, **kwargs)
+        url = request.build_absolute_uri()
+        key = f'{PAGE_KEY_PREFIX}:{hashlib.md5(url.encode()).hexdigest()}'
+        response = _get_cached(key)
+        if response is not None:
+            response['X-Page-Cache'] = 'hit'
+            # Validators set by conditional_page() are cached with the page.
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified', '')
+                ),
+                response=response,
+            )
+        request.page_cache_tags = {}
+        add_page_tags(request, *DEFAULT_TAGS)
+        response = view(request, *args, **kwargs)
+        _store(key, request, response)
+        response['X-Page-Cache'] = 'miss'
+        return response
+    return wrapper
@@ -0,0 +1,229 @@
+"""Paginators for the long post and comment lists."""
+import base64
+import binascii
+import json
+import time
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+FEED_COUNT_VERSION_KEY = 'blog:feed-count-version'
+# Scheduled posts go live without a save, so counts must also expire.
+FEED_COUNT_TIMEOUT = 60 * 5
+PAGE_WINDOW_ON_EACH_SIDE = 2
+PAGE_WINDOW_ON_ENDS = 1
+
+
+def _new_version():
+    # Never restart from a fixed number: once the key is evicted, counts
+    # cached under an earlier version must not become valid again.
+    return time.time_ns()
+
+
+def invalidate_feed_counts():
+    try:
+        cache.incr(FEED_COUNT_VERSION_KEY)
+    except ValueError:
+        cache.set(FEED_COUNT_VERSION_KEY, _new_version(), None)
+
+
+def get_feed_count_version():
+    version = cache.get(FEED_COUNT_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_COUNT_VERSION_KEY, _new_version(), None)
+        version = cache.get(FEED_COUNT_VERSION_KEY)
+    return version
+
+
+def encode_cursor(direction, values=None):
+    payload = json.dumps(
+        [direction, values], separators=(',', ':'), ensure_ascii=True,
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return ``(direction, values)`` or ``None`` for a malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if direction not in (NEXT, PREVIOUS):
+        return None
+    if values is not None and not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class WindowedPage(Page):
+    def page_window(self):
+        """Page numbers around the current one, elided with an ellipsis."""
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=PAGE_WINDOW_ON_EACH_SIDE,
+            on_ends=PAGE_WINDOW_ON_ENDS,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Numbered paginator that keeps the total count in the cache.
+
+    ``count_key`` names the feed; all feed counts are dropped at once when
+    the feed count version is bumped by a post or category change.
+    """
+
+    def __init__(self, object_list, per_page, count_key, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        key = (
+            f'blog:feed-count:{get_feed_count_version()}:{self.count_key}'
+        )
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, FEED_COUNT_TIMEOUT)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class KeysetPage(Sequence):
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def last_cursor(self):
+        return encode_cursor(PREVIOUS)
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking on a unique ordering key.
+
+    ``ordering`` is a pair of fields sorted in the same direction, the
+    last one unique (usually the primary key).  Every page is fetched with
+    a range condition on the key instead of ``OFFSET``, so its cost does
+    not depend on how deep the reader has paged.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def get_page(self, cursor=None):
+        position = decode_cursor(cursor)
+        if position is not None:
+            direction, raw_values = position
+            values = self._parse_values(raw_values)
+            if raw_values is not None and values is None:
+                direction = NEXT
+        else:
+            direction, values = NEXT, None
+
+        forward = direction == NEXT
+        queryset = self.queryset
+        if values is not None:
+            queryset = self._seek(queryset, values, forward)
+        ordering = self.ordering if forward else self._reversed_ordering()
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if not forward:
+            if not has_more:
+                # Paged back to the head of the list: show a full first page.
+                return self.get_page()
+            rows.reverse()
+            has_next = values is not None
+            has_previous = True
+        else:
+            has_next = has_more
+            has_previous = values is not None
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(NEXT, self._key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(PREVIOUS, self._key(rows[0]))
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    def _reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    def _seek(self, queryset, values, forward):
+        first, second = self.fields
+        first_value, second_value = values
+        # Written as a range on the leading column plus a residual filter
+        # so that the database can walk the index instead of OR-ing scans.
+        if self.descending == forward:
+            return queryset.filter(**{f'{first}__lte': first_value}).exclude(
+                **{first: first_value, f'{second}__gte': second_value}
+            )
+        return queryset.filter(**{f'{first}__gte': first_value}).exclude(
+            **{first: first_value, f'{second}__lte': second_value}
+        )
+
+    def _key(self, obj):
+        values = []
+        for name in self.fields:
+            value = getattr(obj, name)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        return values
+
+    def _parse_values(self, raw_values):
+        if raw_values is None or len(raw_values) != len(self.fields):
+            return None
+        opts = self.queryset.model._meta
+        try:
+            values = [
+                opts.get_field(name).to_python(value)
+                for name, value in zip(self.fields, raw_values)
+            ]
+        except ValidationError:
+            return None
+        if any(value is None for value in values):
+            return None
+        return values
@@ -0,0 +1,162 @@
+"""SQLite FTS5 full-text index over post and comment texts.
+
+``blog_post_fts`` and ``blog_comment_fts`` are external-content FTS5
+tables: they store only the inverted index and read the text itself from
+``blog_post``/``blog_comment``.  Triggers on the source tables keep the
+index in sync with every write, including bulk and queryset updates.
+"""
+import re
+from contextlib import contextmanager
+
+from django.db import connections, models
+
+MAX_TERMS = 16
+TOKENIZER = 'unicode61 remove_diacritics 2'
+
+SEARCH_INDEXES = {
+    'blog_post_fts': {
+        'source': 'blog_post',
+        'columns': ('title', 'text'),
+        # bm25 column weights: a hit in the title outranks one in the text.
+        'rank': 'bm25(10.0, 1.0)',
+    },
+    'blog_comment_fts': {
+        'source': 'blog_comment',
+        'columns': ('text',),
+        'rank': 'bm25()',
+    },
+}
+
+
+class FullTextField(models.TextField):
+    """The hidden FTS5 column named after its table; supports ``match``."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+def is_available(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def match_expression(query):
+    """FTS5 query that ANDs the words of ``query``; ``None`` if it has none.
+
+    Every word is quoted, so operators and syntax characters typed by the
+    user are searched for literally instead of breaking the query.
+    """
+    terms = re.findall(r'\w+', query)[:MAX_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def _triggers_sql(table, source, columns):
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    insert = (
+        f'INSERT INTO {table}(rowid, {names}) VALUES (new.id, {new_values});'
+    )
+    delete = (
+        f"INSERT INTO {table}({table}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    return {
+        f'{table}_insert': (
+            f'CREATE TRIGGER {table}_insert AFTER INSERT ON {source} '
+            f'BEGIN {insert} END'
+        ),
+        f'{table}_delete': (
+            f'CREATE TRIGGER {table}_delete AFTER DELETE ON {source} '
+            f'BEGIN {delete} END'
+        ),
+        f'{table}_update': (
+            f'CREATE TRIGGER {table}_update AFTER UPDATE OF {names} '
+            f'ON {source} BEGIN {delete} {insert} END'
+        ),
+    }
+
+
+def install(connection):
+    """Create the FTS5 tables and their triggers where they are missing.
+
+    SQLite drops triggers together with their table, and Django rebuilds a
+    table on most schema changes, so this runs after every ``migrate``.
+    An index that lost a trigger is rebuilt from its source table.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        for table, options in SEARCH_INDEXES.items():
+            if options['source'] not in existing:
+                continue
+            created = table not in existing
+            if created:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {table} USING fts5("
+                    f"{', '.join(options['columns'])}, "
+                    f"content='{options['source']}', content_rowid='id', "
+                    f"tokenize='{TOKENIZER}')"
+                )
+                cursor.execute(
+                    f"INSERT INTO {table}({table}, rank) VALUES ('rank', %s)",
+                    [options['rank']],
+                )
+            triggers = _triggers_sql(
+                table, options['source'], options['columns']
+            )
+            missing = [name for name in triggers if name not in existing]
+            for name in missing:
+                cursor.execute(triggers[name])
+            if created or missing:
+                cursor.execute(
+                    f"INSERT INTO {table}({table}) VALUES ('rebuild')"
+                )
+
+
+def uninstall(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for table in SEARCH_INDEXES:
+            for trigger in ('insert', 'delete', 'update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {table}_{trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def rebuild(connection):
+    with connection.cursor() as cursor:
+        for table in SEARCH_INDEXES:
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+@contextmanager
+def triggers_paused(connection):
+    """Drop the index triggers for a bulk load and rebuild after it.
+
+    One ``rebuild`` is much faster than updating the index row by row.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        for table in SEARCH_INDEXES:
+            for trigger in ('insert', 'delete', 'update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {table}_{trigger}')
+    try:
+        yield
+    finally:
+        # Recreates the triggers and rebuilds the indexes that lost them.
+        install(connection)
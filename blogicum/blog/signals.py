@@ -0,0 +1,151 @@
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import images, search
+from .conditional import CONTENT_TAG
+from .context_processors import invalidate_menu_categories
+from .models import Category, Comment, Location, Post
+from .page_cache import invalidate_tags
+from .pagination import invalidate_feed_counts
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id,
+        comment_count__gt=0,
+    ).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def drop_feed_counts(sender, **kwargs):
+    invalidate_feed_counts()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def drop_menu_categories(sender, **kwargs):
+    invalidate_menu_categories()
+
+
+def _post_page_tags(author_id, category_id):
+    return {'feed', f'author:{author_id}', f'category:{category_id}'}
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_pages(sender, instance, raw=False, **kwargs):
+    # A post moved to another author or category leaves their pages too.
+    instance._previous_page_tags = set()
+    if instance.pk is None or raw:
+        return
+    previous = Post.objects.filter(pk=instance.pk).values(
+        'author_id', 'category_id'
+    ).first()
+    if previous is not None:
+        instance._previous_page_tags = _post_page_tags(
+            previous['author_id'], previous['category_id']
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def drop_post_pages(sender, instance, **kwargs):
+    invalidate_tags(
+        f'post:{instance.pk}',
+        *_post_page_tags(instance.author_id, instance.category_id),
+        *getattr(instance, '_previous_page_tags', ()),
+    )
+
+
+@receiver(post_save, sender=Post)
+def queue_image_renditions(sender, instance, raw=False, **kwargs):
+    deferred = instance.get_deferred_fields()
+    if raw or {'image', 'image_renditions'} & deferred:
+        return
+    if images.needs_renditions(instance):
+        images.schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=Post)
+def drop_post_validators(sender, **kwargs):
+    # A deleted post does not move any MAX(updated_at).
+    invalidate_tags(CONTENT_TAG)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def drop_comment_pages(sender, instance, **kwargs):
+    invalidate_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def drop_category_pages(sender, **kwargs):
+    # Categories are listed in the menu of every page.
+    invalidate_tags('menu', CONTENT_TAG)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def drop_location_pages(sender, instance, **kwargs):
+    invalidate_tags(f'location:{instance.pk}', CONTENT_TAG)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_author_pages(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        # Every login saves the user; nothing shown on pages changes.
+        return
+    invalidate_tags(f'author:{instance.pk}', CONTENT_TAG)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, apps=global_apps, **kwargs):
+    if sender.label != 'blog':
+        return
+    try:
+        apps.get_model('blog', 'PostSearchEntry')
+    except LookupError:
+        # Migrated back past the migration that creates the index.
+        return
+    search.install(connections[using])
@@ -0,0 +1,143 @@
+"""Fingerprinted, gzip-precompressed static files and a view serving them.
+
+``collectstatic`` writes ``css/site.<hash>.css`` and, for text assets, a
+``css/site.<hash>.css.gz`` sibling.  ``serve()`` picks the ``.gz`` file
+for clients that accept gzip and marks fingerprinted names immutable.
+"""
+import gzip
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+COMPRESSIBLE_EXTENSIONS = frozenset((
+    '.css', '.js', '.svg', '.txt', '.json', '.xml', '.ico', '.map',
+))
+# Below this the gzip header and the extra file are not worth it.
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+# Unhashed names may change in place, so keep their lifetime short.
+PLAIN_MAX_AGE = 60 * 60
+
+
+def is_compressible(name):
+    return posixpath.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes ``.gz`` copies of text assets.
+
+    Until ``collectstatic`` has produced a manifest, for example in tests
+    or a fresh checkout, URLs fall back to the plain file names.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected yet: serve it under its own name.
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        # Compress once the last pass has settled the hashed contents.
+        for name in paths:
+            self._compress(name)
+            hashed_name = self.hashed_files.get(self.hash_key(name))
+            if hashed_name:
+                self._compress(hashed_name)
+
+    def _compress(self, name):
+        if not is_compressible(name):
+            return
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        # mtime=0 keeps the output identical between runs.
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return
+        gz_name = f'{name}.gz'
+        if self.exists(gz_name):
+            self.delete(gz_name)
+        self._save(gz_name, ContentFile(compressed))
+
+
+def _accepts_gzip(request):
+    for coding in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = coding.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00')
+    return False
+
+
+def _is_fingerprinted(path):
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+    return bool(hashed_files) and path in hashed_files.values()
+
+
+def serve(request, path):
+    """Serve a collected static file, preferring its ``.gz`` copy.
+
+    For deployments without a front-end server that does this itself.
+    """
+    if not settings.STATIC_ROOT:
+        raise Http404('STATIC_ROOT не задан.')
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден.')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден.')
+
+    compressible = is_compressible(path)
+    encoding = None
+    if (
+        compressible
+        and _accepts_gzip(request)
+        and os.path.isfile(f'{full_path}.gz')
+    ):
+        full_path, encoding = f'{full_path}.gz', 'gzip'
+
+    stat = os.stat(full_path)
+    if not was_modified_since(
+        request.headers.get('If-Modified-Since'), stat.st_mtime, stat.st_size
+    ):
+        response = HttpResponseNotModified()
+    else:
+        content_type = mimetypes.guess_type(path)[0]
+        response = FileResponse(
+            open(full_path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        response['Content-Length'] = stat.st_size
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if _is_fingerprinted(path):
+        response['Cache-Control'] = (
+            f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        )
+    else:
+        response['Cache-Control'] = f'public, max-age={PLAIN_MAX_AGE}'
+    if compressible:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
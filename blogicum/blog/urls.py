@@ -12,7 +12,13 @@ urlpatterns = [
         views.profile_redirect,
         name='legacy_profile_redirect',
     ),
+    path('search/', views.search, name='search'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments',
+    ),
     path('posts/create/', views.create_post, name='create_post'),
     path('posts/<int:post_id>/edit/', views.edit_post, name='edit_post'),
     path('posts/<int:post_id>/delete/', views.delete_post, name='delete_post'),
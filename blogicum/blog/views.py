@@ -1,80 +1,115 @@
+import hashlib
+from urllib.parse import urlencode
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Count
-from django.http import Http404
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
-from django.utils import timezone
 from django.views.generic import CreateView
 
+from .conditional import (
+    category_timestamps,
+    conditional_page,
+    feed_timestamps,
+    post_timestamps,
+)
 from .forms import CommentForm, PostForm, UserEditForm
 from .models import Category, Comment, Post
+from .page_cache import add_page_tags, anonymous_page_cache, post_tags
+from .pagination import CachedCountPaginator, KeysetPaginator
+from .search import match_expression
 
 User = get_user_model()
 POSTS_ON_PAGE = 10
+FEED_ORDERING = ('-pub_date', '-id')
+COMMENTS_ON_PAGE = 20
+COMMENT_ORDERING = ('created_at', 'id')
 
 
-def get_published_posts():
+def get_feed(queryset):
     return (
-        Post.objects.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True,
-        )
-        .annotate(comment_count=Count('comments'))
-        .select_related('author', 'category', 'location')
-        .order_by('-pub_date')
+        queryset.with_feed_relations()
+        .defer('text')
+        .order_by(*FEED_ORDERING)
     )
 
 
-def paginate_queryset(queryset, request):
-    paginator = Paginator(queryset, POSTS_ON_PAGE)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+def get_published_posts():
+    return get_feed(Post.objects.published())
 
 
-def is_post_available_for_public(post):
-    return (
-        post.is_published
-        and post.pub_date <= timezone.now()
-        and post.category is not None
-        and post.category.is_published
-    )
+def paginate_queryset(queryset, request, count_key):
+    if 'page' in request.GET:
+        # Numbered pages are kept for old links; they cost OFFSET + COUNT.
+        paginator = CachedCountPaginator(queryset, POSTS_ON_PAGE, count_key)
+        return paginator.get_page(request.GET.get('page'))
+    paginator = KeysetPaginator(queryset, POSTS_ON_PAGE, FEED_ORDERING)
+    return paginator.get_page(request.GET.get('cursor'))
 
 
+@anonymous_page_cache
+@conditional_page(feed_timestamps)
 def index(request):
-    page_obj = paginate_queryset(get_published_posts(), request)
+    add_page_tags(request, 'feed')
+    page_obj = paginate_queryset(get_published_posts(), request, 'index')
+    add_page_tags(request, *post_tags(page_obj))
     return render(request, 'blog/index.html', {'page_obj': page_obj})
 
 
+@anonymous_page_cache
+@conditional_page(category_timestamps)
 def category_posts(request, category_slug):
     category = get_object_or_404(
         Category,
         slug=category_slug,
         is_published=True,
     )
+    add_page_tags(request, f'category:{category.pk}')
     page_obj = paginate_queryset(
         get_published_posts().filter(category=category),
         request,
+        f'category:{category.pk}',
     )
+    add_page_tags(request, *post_tags(page_obj))
     context = {'category': category, 'page_obj': page_obj}
     return render(request, 'blog/category.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = (
+        Post.objects.published().search(query)
+        .with_feed_relations()
+        .defer('text')
+    )
+    # Ranked results cannot be seeked by key, so they are always numbered.
+    key = hashlib.md5(str(match_expression(query)).encode()).hexdigest()
+    paginator = CachedCountPaginator(posts, POSTS_ON_PAGE, f'search:{key}')
+    context = {
+        'query': query,
+        'page_obj': paginator.get_page(request.GET.get('page')),
+        'page_query': f"{urlencode({'q': query})}&",
+    }
+    return render(request, 'blog/search.html', context)
+
+
+@anonymous_page_cache
+@conditional_page(feed_timestamps)
 def profile(request, username):
     profile_user = get_object_or_404(User, username=username)
-    if request.user == profile_user:
-        post_list = (
-            Post.objects.filter(author=profile_user)
-            .annotate(comment_count=Count('comments'))
-            .select_related('author', 'category', 'location')
-            .order_by('-pub_date')
-        )
-    else:
-        post_list = get_published_posts().filter(author=profile_user)
-    page_obj = paginate_queryset(post_list, request)
+    is_owner = request.user == profile_user
+    add_page_tags(request, f'author:{profile_user.pk}')
+    post_list = get_feed(
+        Post.objects.visible_to(request.user).filter(author=profile_user)
+    )
+    page_obj = paginate_queryset(
+        post_list,
+        request,
+        f"profile:{profile_user.pk}:{'owner' if is_owner else 'public'}",
+    )
+    add_page_tags(request, *post_tags(page_obj))
     context = {'profile': profile_user, 'page_obj': page_obj}
     return render(request, 'blog/profile.html', context)
 
@@ -84,25 +119,49 @@ def profile_redirect(request):
     return redirect('blog:profile', request.user.username)
 
 
-def post_detail(request, post_id):
-    post = get_object_or_404(
-        Post.objects.select_related('author', 'category', 'location'),
+def get_visible_post_or_404(request, post_id):
+    return get_object_or_404(
+        Post.objects.visible_to(request.user)
+        .with_feed_relations()
+        .defer('text'),
         pk=post_id,
     )
-    can_view = (
-        request.user == post.author
-        or is_post_available_for_public(post)
+
+
+def get_comments_page(post, cursor):
+    paginator = KeysetPaginator(
+        post.comments.select_related('author').defer('text'),
+        COMMENTS_ON_PAGE,
+        COMMENT_ORDERING,
     )
-    if not can_view:
-        raise Http404
+    return paginator.get_page(cursor)
 
-    comments = post.comments.select_related('author')
+
+@anonymous_page_cache
+@conditional_page(post_timestamps)
+def post_detail(request, post_id):
+    add_page_tags(request, f'post:{post_id}')
+    post = get_visible_post_or_404(request, post_id)
+    comments = get_comments_page(post, request.GET.get('comments'))
+    add_page_tags(
+        request,
+        *post_tags([post]),
+        *(f'author:{comment.author_id}' for comment in comments),
+    )
     context = {'post': post, 'comments': comments}
     if request.user.is_authenticated:
         context['form'] = CommentForm()
     return render(request, 'blog/detail.html', context)
 
 
+def post_comments(request, post_id):
+    """Next batch of a post's comments as an HTML fragment."""
+    post = get_visible_post_or_404(request, post_id)
+    comments = get_comments_page(post, request.GET.get('cursor'))
+    context = {'post': post, 'comments': comments}
+    return render(request, 'includes/comment_list.html', context)
+
+
 @login_required
 def create_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -153,7 +212,8 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
     return redirect('blog:post_detail', post_id)
 
 
@@ -185,7 +245,8 @@ def delete_comment(request, post_id, comment_id):
         return redirect('blog:post_detail', post_id)
 
     if request.method == 'POST':
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
         return redirect('blog:post_detail', post_id)
 
     return render(request, 'blog/comment.html', {'comment': comment})
@@ -1,4 +1,5 @@
 """Django settings for blogicum project."""
+import os
 from pathlib import Path
 
 
@@ -27,6 +28,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'blog.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,9 +67,47 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# The menu, page cache and feed counts are invalidated by the process that
+# saves a model, so every worker must read the same cache: a per-process
+# LocMemCache would keep serving stale pages in the others.  Invalidation
+# bumps version keys with incr() on every write, which memcached does
+# atomically in one round trip.  FileBasedCache is only a fallback for a
+# host without memcached: its incr() is a read and a write, every write
+# lists the whole cache directory to cull it, and culling may drop the
+# version keys.  A single runserver process may use LocMemCache.
+CACHE_BACKEND = os.environ.get(
+    'BLOGICUM_CACHE_BACKEND',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get(
+            'BLOGICUM_CACHE_LOCATION',
+            str(BASE_DIR / '.cache')
+            if CACHE_BACKEND.endswith('.FileBasedCache')
+            else '127.0.0.1:11211',
+        ),
+    }
+}
+if CACHE_BACKEND.endswith('.FileBasedCache'):
+    # The default 300 entries would evict cached pages all the time.
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+# Applied to every new SQLite connection by blog.signals.configure_sqlite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -99,9 +139,20 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'static_root'
+STATICFILES_STORAGE = (
+    'blog.static_files.PrecompressedManifestStaticFilesStorage'
+)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache, lighttpd) hands
+# media files to the front-end server; None streams them from Django.
+MEDIA_SENDFILE = None
+# nginx ``internal`` location aliased to MEDIA_ROOT.
+MEDIA_ACCEL_REDIRECT_LOCATION = '/protected-media/'
+# Pages and images downloaded by seed_demo, reused by later runs.
+DEMO_CACHE_DIR = BASE_DIR / '.demo_cache'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
@@ -114,3 +165,24 @@ LOGOUT_REDIRECT_URL = 'blog:index'
 
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'blog.queries': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'blog.images': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
@@ -1,9 +1,9 @@
 """blogicum URL Configuration."""
 from django.conf import settings
 from django.contrib import admin
-from django.conf.urls.static import static
-from django.urls import include, path
+from django.urls import include, path, re_path
 
+from blog import media_files, static_files
 from blog.views import RegistrationView
 
 handler404 = 'pages.views.page_not_found'
@@ -20,10 +20,13 @@ urlpatterns = [
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
+    # ``runserver`` serves static files itself while DEBUG is on.
+    re_path(
+        rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.+)$',
+        static_files.serve,
+    ),
+    re_path(
+        rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$',
+        media_files.serve,
+    ),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT,
-    )
@@ -1,3 +1,5 @@
 @echo off
 cd /d "%~dp0blogicum"
+rem runserver serves from one process, so its own memory cache is enough.
+if not defined BLOGICUM_CACHE_BACKEND set BLOGICUM_CACHE_BACKEND=django.core.cache.backends.locmem.LocMemCache
 python manage.py start_demo
@@ -34,6 +34,9 @@ class PostModelAdapter(StudentModelAdapter):
             "category",
             "location",
             "refresh_from_db",
+            "image_width",
+            "image_height",
+            "image_placeholder",
         ]
 
     @property
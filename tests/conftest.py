@@ -41,6 +41,26 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache():
+    # Tests must neither read nor wipe the cache of a running server.
+    with override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(isolated_cache):
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -92,6 +112,7 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.queries",
     "adapters.comment",
 ]
 
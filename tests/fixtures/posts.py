@@ -109,6 +109,21 @@ def many_posts_with_published_locations(
     )
 
 
+@pytest.fixture
+def make_post(mixer: Mixer, user, published_category):
+    """Factory of posts visible in the feed; keyword arguments override."""
+
+    def make(**kwargs) -> Model:
+        kwargs.setdefault("author", user)
+        kwargs.setdefault("category", published_category)
+        kwargs.setdefault("location", None)
+        kwargs.setdefault("is_published", True)
+        kwargs.setdefault("pub_date", timezone.now() - timedelta(days=1))
+        return mixer.blend("blog.Post", **kwargs)
+
+    return make
+
+
 @pytest.fixture
 def post_comment_context_form_item(
     user_client: Client, post_with_published_location
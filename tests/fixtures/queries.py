@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def query_budget():
+    """Usage:
+
+    with query_budget(5, 'главная страница'):
+        client.get('/')
+    """
+
+    @contextmanager
+    def _query_budget(limit: int, description: str):
+        with CaptureQueriesContext(connection) as captured:
+            yield captured
+        executed = [query['sql'] for query in captured]
+        assert len(executed) <= limit, (
+            f'Страница «{description}» выполняет {len(executed)} SQL-запросов'
+            f' при допустимых {limit}:\n' + '\n'.join(executed)
+        )
+
+    return _query_budget
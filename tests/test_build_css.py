@@ -0,0 +1,59 @@
+import pytest
+from django.core.management import call_command
+
+from blog.css_purge import purge
+
+CSS = (
+    '@charset "UTF-8";'
+    ':root{--x:1}'
+    'p{margin:0}'
+    '.card{color:red}'
+    '.modal,.card-title{color:blue}'
+    '.btn-group>.btn:not(.dropdown-toggle){border:0}'
+    '.btn-check:checked+.btn{color:green}'
+    '@media (min-width:576px){.modal{top:0}.card{top:1px}}'
+    '@keyframes spin{to{transform:rotate(1turn)}}'
+    '.spinner{animation:spin 1s}'
+    '.label::after{content:"{.modal}"}'
+)
+
+
+def test_purge_keeps_only_selectors_that_can_match():
+    purged = purge(CSS, {'card', 'card-title', 'btn', 'btn-group', 'label'})
+    assert purged == (
+        '@charset "UTF-8";'
+        ':root{--x:1}'
+        'p{margin:0}'
+        '.card{color:red}'
+        '.card-title{color:blue}'
+        '.btn-group>.btn:not(.dropdown-toggle){border:0}'
+        '@media (min-width:576px){.card{top:1px}}'
+        '.label::after{content:"{.modal}"}'
+    )
+
+
+def test_purge_keeps_keyframes_in_use():
+    assert '@keyframes spin' in purge(CSS, {'spinner'})
+
+
+def test_critical_subset_is_limited_to_given_tags():
+    purged = purge(CSS, {'card'}, tags={'html', 'body'})
+    assert 'p{' not in purged
+    assert '.card{color:red}' in purged
+
+
+def test_built_css_is_up_to_date():
+    call_command('build_css', check=True)
+
+
+@pytest.mark.django_db
+def test_pages_inline_critical_css(client):
+    content = client.get('/').content.decode('utf-8')
+    head = content.split('</head>')[0]
+    assert '<style>' in head and '.top-nav{' in head, (
+        'Убедитесь, что стили шапки встроены в страницу.'
+    )
+    assert 'bootstrap.min.css' not in content
+    assert 'bootstrap.purged.css" media="print"' in head, (
+        'Убедитесь, что урезанный Bootstrap не блокирует отрисовку.'
+    )
@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_add_and_delete(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Второй'})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что при добавлении комментария счётчик `comment_count` '
+        'публикации увеличивается.'
+    )
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при удалении комментария счётчик `comment_count` '
+        'публикации уменьшается.'
+    )
+
+
+def test_comment_count_follows_cascading_delete(
+        mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post, author=another_user)
+    mixer.blend('blog.Comment', post=post)
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=100)
+    updated_at = Post.objects.get(pk=post.pk).updated_at
+    call_command('recount_comments', chunk_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 2
+    assert post.updated_at > updated_at, (
+        'Убедитесь, что исправленный счётчик меняет `updated_at`, иначе '
+        'клиенты получают 304 со старым числом комментариев.'
+    )
+
+    call_command('recount_comments', stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).updated_at == post.updated_at
+
+
+def test_saving_post_keeps_comments_added_meanwhile(
+        mixer, another_user, post_with_published_location
+):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend('blog.Comment', post=post, author=another_user)
+    post.title = 'Новый заголовок'
+    post.save()
+    post.refresh_from_db()
+    assert post.title == 'Новый заголовок'
+    assert post.comment_count == 1, (
+        'Убедитесь, что сохранение публикации не перезаписывает счётчик '
+        'комментариев, изменившийся после её загрузки.'
+    )
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Comment
+from blog.views import COMMENTS_ON_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def long_thread(user, post_with_published_location):
+    post = post_with_published_location
+    start = timezone.now() - timedelta(days=1)
+    for i in range(COMMENTS_ON_PAGE * 2 + 5):
+        Comment.objects.create(post=post, author=user, text=f'Реплика {i}')
+    # Give every second comment the same timestamp to exercise the id tie.
+    for i, comment in enumerate(Comment.objects.order_by('id')):
+        Comment.objects.filter(pk=comment.pk).update(
+            created_at=start + timedelta(minutes=i // 2)
+        )
+    return list(Comment.objects.order_by('created_at', 'id'))
+
+
+def test_comment_thread_is_loaded_in_batches(client, long_thread):
+    post_id = long_thread[0].post_id
+    response = client.get(f'/posts/{post_id}/')
+    comments = response.context['comments']
+    assert len(comments) == COMMENTS_ON_PAGE, (
+        'Убедитесь, что на странице поста выводится только первая порция '
+        'комментариев.'
+    )
+
+    seen = [comment.id for comment in comments]
+    cursor = comments.next_cursor
+    while cursor:
+        fragment = client.get(f'/posts/{post_id}/comments/?cursor={cursor}')
+        assert fragment.status_code == 200
+        assert '<html' not in fragment.content.decode()
+        batch = fragment.context['comments']
+        seen.extend(comment.id for comment in batch)
+        cursor = batch.next_cursor
+    assert seen == [comment.id for comment in long_thread], (
+        'Убедитесь, что порции комментариев идут по порядку и без повторов.'
+    )
+
+
+def test_comment_fragment_respects_post_visibility(client, long_thread):
+    post = long_thread[0].post
+    post.is_published = False
+    post.save()
+    response = client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == 404
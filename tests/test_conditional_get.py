@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(make_post):
+    return make_post()
+
+
+def _revalidate(client, url, etag):
+    return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+
+@pytest.mark.parametrize('client_name', ('client', 'user_client'))
+def test_unchanged_pages_answer_not_modified(request, client_name, post):
+    client = request.getfixturevalue(client_name)
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+    ):
+        response = client.get(url)
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'
+        ), f'Убедитесь, что страница {url} отдаёт ETag и Last-Modified.'
+        repeated = _revalidate(client, url, response['ETag'])
+        assert repeated.status_code == 304, (
+            f'Убедитесь, что неизменившаяся страница {url} отвечает '
+            '`304 Not Modified`.'
+        )
+        assert not repeated.templates
+
+
+def test_etag_depends_on_viewer(client, user_client, post):
+    anonymous = client.get(f'/posts/{post.id}/')['ETag']
+    logged_in = user_client.get(f'/posts/{post.id}/')['ETag']
+    assert anonymous != logged_in
+
+
+def test_changes_refresh_validators(
+        user_client, client, post, mixer, make_post
+):
+    url = f'/posts/{post.id}/'
+    etag = client.get(url)['ETag']
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Привет'})
+    response = _revalidate(client, url, etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что после добавления комментария страница публикации '
+        'отдаётся заново.'
+    )
+
+    etag = response['ETag']
+    comment = post.comments.get()
+    comment.text = 'Исправлено'
+    comment.save()
+    assert _revalidate(client, url, etag).status_code == 200
+
+    other = make_post(pub_date=timezone.now() + timedelta(days=1))
+    # Bypasses the anonymous page cache, which expires such pages itself.
+    etag = user_client.get('/')['ETag']
+    # A scheduled post goes live without being saved.
+    Post.objects.filter(pk=other.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    response = _revalidate(user_client, '/', etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что лента обновляется, когда наступает время отложенной '
+        'публикации.'
+    )
+
+    etag = response['ETag']
+    other.delete()
+    assert _revalidate(user_client, '/', etag).status_code == 200, (
+        'Убедитесь, что лента обновляется после удаления публикации.'
+    )
+
+
+def test_if_modified_since(client, post):
+    response = client.get(f'/posts/{post.id}/')
+    repeated = client.get(
+        f'/posts/{post.id}/',
+        HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    )
+    assert repeated.status_code == 304
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+from django.db import connection
+from django.db.models import Count, F
+
+from blog import demo_data
+from blog.models import Category, Comment, CommentSearchEntry, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_zipf_counts_are_exact_skewed_and_seeded():
+    counts = demo_data.zipf_counts(10000, 500, random.Random(1))
+    assert len(counts) == 500
+    assert sum(counts) == 10000
+    ranked = sorted(counts, reverse=True)
+    assert ranked[0] > 5 * ranked[9] > 25 * ranked[99], (
+        'Убедитесь, что комментарии распределяются по закону Ципфа: '
+        'у немногих публикаций их намного больше, чем у остальных.'
+    )
+    assert counts == demo_data.zipf_counts(10000, 500, random.Random(1))
+
+
+def test_seed_bulk_generates_consistent_data():
+    demo_data.seed_bulk(
+        users=20, posts=400, comments=3000, categories=12, seed=3
+    )
+    posts = Post.objects.filter(author__username__startswith='loaduser')
+    assert posts.count() == 400
+    assert Comment.objects.count() == 3000
+    mismatched = posts.annotate(actual=Count('comments')).exclude(
+        comment_count=F('actual')
+    )
+    assert not mismatched.exists(), (
+        'Убедитесь, что comment_count сгенерированных публикаций совпадает '
+        'с числом их комментариев.'
+    )
+    assert posts.filter(is_published=False).exists()
+    assert posts.exclude(pk__in=Post.objects.published()).exists()
+    assert Category.objects.filter(is_published=False).exists()
+    by_author = sorted(
+        posts.order_by().values('author').annotate(total=Count('pk'))
+        .values_list('total', flat=True),
+        reverse=True,
+    )
+    assert by_author[0] > 3 * by_author[-1]
+
+
+def test_seed_bulk_is_deterministic():
+    def titles():
+        return list(
+            Post.objects.order_by('-pk')[:50].values_list('title', 'text')
+        )[::-1]
+
+    demo_data.seed_bulk(users=5, posts=50, comments=100, categories=3)
+    first = titles()
+    demo_data.seed_bulk(users=5, posts=50, comments=100, categories=3)
+    assert titles() == first
+
+
+def test_search_index_is_rebuilt_after_bulk_load(monkeypatch):
+    monkeypatch.setattr(demo_data, 'REINDEX_THRESHOLD', 0)
+    demo_data.seed_bulk(users=3, posts=30, comments=200, categories=2)
+    assert CommentSearchEntry.objects.count() == 200
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' "
+            "AND name LIKE 'blog_%_fts_%'"
+        )
+        assert cursor.fetchone()[0] == 6, (
+            'Убедитесь, что после массовой загрузки триггеры поискового '
+            'индекса восстанавливаются.'
+        )
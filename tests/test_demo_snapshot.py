@@ -0,0 +1,80 @@
+import sqlite3
+from contextlib import closing
+from datetime import date
+from operator import ne
+
+from blog import demo_snapshot
+from blog.context_processors import _get_menu_version
+from blog.page_cache import tag_versions
+from blog.pagination import get_feed_count_version
+
+
+def _titles(database):
+    with closing(sqlite3.connect(database)) as connection:
+        return [
+            row[0] for row in connection.execute('SELECT title FROM post')
+        ]
+
+
+def _set_title(database, title):
+    with closing(sqlite3.connect(database)) as connection:
+        connection.execute('UPDATE post SET title = ?', [title])
+        connection.commit()
+
+
+def test_snapshot_restores_database_and_images(tmp_path):
+    database = tmp_path / 'db.sqlite3'
+    with closing(sqlite3.connect(database)) as connection:
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('CREATE TABLE post (title TEXT)')
+        connection.execute("INSERT INTO post VALUES ('Из снимка')")
+        connection.commit()
+    images = tmp_path / 'media' / 'posts_images'
+    images.mkdir(parents=True)
+    (images / 'photo.jpg').write_bytes(b'seeded')
+    snapshot = tmp_path / 'snapshots' / 'key'
+
+    assert not demo_snapshot.restore(snapshot, database, tmp_path / 'media')
+    demo_snapshot.save(snapshot, database, tmp_path / 'media')
+
+    _set_title(database, 'Изменено')
+    (images / 'photo.jpg').write_bytes(b'changed')
+    (images / 'upload.jpg').write_bytes(b'new')
+    cached = (
+        _get_menu_version(), get_feed_count_version(), tag_versions(['menu'])
+    )
+    assert demo_snapshot.restore(snapshot, database, tmp_path / 'media')
+    restored = (
+        _get_menu_version(), get_feed_count_version(), tag_versions(['menu'])
+    )
+    assert all(map(ne, cached, restored)), (
+        'Убедитесь, что после восстановления снимка меню, счётчики ленты '
+        'и закэшированные страницы строятся заново.'
+    )
+    assert _titles(database) == ['Из снимка']
+    assert [path.name for path in images.iterdir()] == ['photo.jpg']
+    assert (images / 'photo.jpg').read_bytes() == b'seeded'
+
+    demo_snapshot.save(
+        tmp_path / 'snapshots' / 'other', database, tmp_path / 'media'
+    )
+    assert [path.name for path in snapshot.parent.iterdir()] == ['other'], (
+        'Убедитесь, что при сохранении нового снимка старые удаляются.'
+    )
+
+
+def test_snapshot_key_depends_on_version_offline_and_day(monkeypatch):
+    key = demo_snapshot.snapshot_key(1, offline=False)
+    assert key == demo_snapshot.snapshot_key(1, offline=False)
+    assert key != demo_snapshot.snapshot_key(2, offline=False)
+    assert key != demo_snapshot.snapshot_key(1, offline=True), (
+        'Убедитесь, что снимок с логотипами вместо изображений не '
+        'используется при запуске с доступом к сети.'
+    )
+    monkeypatch.setattr(
+        demo_snapshot.timezone, 'localdate', lambda: date(2030, 1, 1)
+    )
+    assert key != demo_snapshot.snapshot_key(1, offline=False), (
+        'Убедитесь, что даты демо-публикаций не застывают: снимок '
+        'действителен только в день заполнения.'
+    )
@@ -0,0 +1,60 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(5000))
+
+
+def test_excerpt_matches_truncatewords(post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10), (
+        'Убедитесь, что при сохранении публикации её анонс совпадает с '
+        'первыми десятью словами текста.'
+    )
+
+
+def test_feeds_do_not_load_post_text(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert truncatewords(LONG_TEXT, 10) in response.content.decode()
+        assert not [
+            query for query in queries
+            if '"blog_post"."text"' in query['sql']
+        ], f'Убедитесь, что лента `{url}` не загружает полный текст постов.'
+
+
+def test_backfill_excerpts_command(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(excerpt='')
+    updated_at = Post.objects.get(pk=post.pk).updated_at
+    call_command('backfill_excerpts', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(post.text, 10)
+    assert post.updated_at > updated_at, (
+        'Убедитесь, что новый анонс меняет `updated_at`, иначе клиенты '
+        'получают 304 со старыми карточками.'
+    )
+
+    call_command('backfill_excerpts', stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).updated_at == post.updated_at
@@ -0,0 +1,66 @@
+import threading
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.fetch_cache import FetchCache, fetch_all
+from blog.models import Post
+
+
+def test_cache_stores_each_body_once(tmp_path):
+    cache = FetchCache(tmp_path)
+    assert cache.get('https://example.com/a.jpg') is None
+    cache.put('https://example.com/a.jpg', b'image')
+    cache.put('https://example.com/b.jpg', b'image')
+    assert cache.get('https://example.com/b.jpg') == b'image'
+    assert len(list((tmp_path / 'objects').rglob('*'))) == 2, (
+        'Убедитесь, что одинаковое содержимое хранится в кэше один раз.'
+    )
+
+
+def test_fetch_all_is_parallel_and_bounded(tmp_path):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        with lock:
+            running.append(url)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(url)
+        return None if url.endswith('broken') else url.encode()
+
+    urls = [f'https://example.com/{index}' for index in range(12)]
+    urls.append('https://example.com/broken')
+    cache = FetchCache(tmp_path)
+    results = fetch_all(urls, fetch, cache, workers=4)
+    assert results['https://example.com/3'] == b'https://example.com/3'
+    assert results['https://example.com/broken'] is None
+    assert 1 < max(peak) <= 4
+    assert cache.get('https://example.com/broken') is None
+
+    def offline_fetch(url):
+        raise AssertionError('Запрос к сети при наличии кэша.')
+
+    cached = fetch_all(urls[:12], offline_fetch, cache)
+    assert cached == {url: url.encode() for url in urls[:12]}
+    assert fetch_all(
+        ['https://example.com/new'], offline_fetch, cache, offline=True
+    ) == {'https://example.com/new': None}
+
+
+@pytest.mark.django_db
+def test_seed_demo_offline_makes_no_requests(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.DEMO_CACHE_DIR = tmp_path / 'cache'
+
+    def no_network(*args, **kwargs):
+        raise AssertionError('Убедитесь, что --offline не обращается к сети.')
+
+    monkeypatch.setattr('requests.Session.get', no_network)
+    call_command('seed_demo', offline=True, stdout=StringIO())
+    assert Post.objects.exclude(image='').count() == 3
@@ -0,0 +1,231 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+from PIL import ImageFile as PILImageFile
+
+from blog.images import RENDITION_WIDTHS, generate_renditions
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_image(width, height, name='photo.png'):
+    output = BytesIO()
+    Image.new('RGB', (width, height), (73, 109, 137)).save(output, 'PNG')
+    return ImageFile(output, name=name)
+
+
+def test_renditions_are_queued_after_commit(
+        make_post, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks() as callbacks:
+        make_post(image=make_image(2000, 1000))
+    assert len(callbacks) == 1, (
+        'Убедитесь, что уменьшенные копии изображения готовятся после '
+        'фиксации транзакции, а не во время запроса.'
+    )
+
+
+def test_renditions_are_served_with_srcset(client, make_post):
+    post = make_post(image=make_image(2000, 1000))
+    generate_renditions(post.pk)
+    post.refresh_from_db()
+
+    widths = [item['width'] for item in post.image_renditions['jpeg']]
+    assert widths == sorted(RENDITION_WIDTHS)
+    for item in post.image_renditions['jpeg']:
+        assert default_storage.exists(item['name'])
+        with default_storage.open(item['name']) as file:
+            assert Image.open(file).size[0] == item['width']
+
+    content = client.get('/').content.decode('utf-8')
+    assert f'{post.card_image_url}' in content
+    assert 'srcset="' in content and '480w' in content and '1560w' in content
+    assert post.image.url not in content.replace(
+        f'href="{post.image.url}"', ''
+    ), 'Убедитесь, что в ленте не загружается исходное изображение.'
+
+
+def test_small_images_are_not_upscaled(make_post):
+    post = make_post(image=make_image(300, 200))
+    generate_renditions(post.pk)
+    post.refresh_from_db()
+    assert post.image_renditions['jpeg'] == []
+    assert post.card_image_url == post.image.url
+    assert post.image_srcset == ''
+
+
+def test_replaced_image_gets_new_renditions(make_post):
+    post = make_post(image=make_image(1000, 500))
+    generate_renditions(post.pk)
+    post.refresh_from_db()
+    old_names = [item['name'] for item in post.image_renditions['jpeg']]
+
+    post.image = make_image(1200, 600, name='other.png')
+    post.save()
+    assert post.image_srcset == '', (
+        'Убедитесь, что копии прежнего изображения не показываются для '
+        'нового.'
+    )
+    generate_renditions(post.pk)
+    post = Post.objects.get(pk=post.pk)
+    assert post.image_renditions['source'] == post.image.name
+    assert not any(default_storage.exists(name) for name in old_names)
+
+
+def test_webp_copies_are_offered_with_jpeg_fallback(client, make_post):
+    post = make_post(image=make_image(2000, 1000))
+    generate_renditions(post.pk)
+    post.refresh_from_db()
+
+    webp = post.image_renditions['webp']
+    assert [item['width'] for item in webp] == sorted(RENDITION_WIDTHS)
+    for item, jpeg in zip(webp, post.image_renditions['jpeg']):
+        with default_storage.open(item['name']) as file:
+            assert Image.open(file).format == 'WEBP'
+        assert item['size'] <= jpeg['size'], (
+            'Убедитесь, что WebP-копия не больше JPEG-копии того же размера.'
+        )
+    jpeg_sizes = {
+        jpeg['width']: jpeg['size'] for jpeg in post.image_renditions['jpeg']
+    }
+    assert post.image_renditions['webp_saved'] == sum(
+        jpeg_sizes[item['width']] - item['size'] for item in webp
+    )
+
+    content = client.get('/').content.decode('utf-8')
+    assert (
+        f'<source type="image/webp" srcset="{post.image_webp_srcset}"'
+    ) in content
+    assert f'src="{post.card_image_url}"' in content, (
+        'Убедитесь, что для браузеров без WebP остаётся JPEG-копия.'
+    )
+
+
+def test_webp_over_budget_falls_back_to_jpeg(
+        client, make_post, media_root, monkeypatch
+):
+    monkeypatch.setattr('blog.images.WEBP_BYTES_PER_PIXEL', 0.0001)
+    post = make_post(image=make_image(1000, 500))
+    generate_renditions(post.pk)
+    post.refresh_from_db()
+
+    assert post.image_renditions['jpeg']
+    assert post.image_renditions['webp'] == [], (
+        'Убедитесь, что WebP-копия, не уложившаяся в бюджет даже при '
+        'наименьшем качестве, не сохраняется.'
+    )
+    assert post.image_renditions['webp_saved'] == 0
+    assert not any(
+        path.suffix == '.webp'
+        for path in (media_root / 'posts_images').iterdir()
+    )
+    assert '<source type="image/webp"' not in client.get('/').content.decode(
+        'utf-8'
+    )
+
+
+def test_outdated_renditions_are_regenerated(make_post):
+    post = make_post(image=make_image(1000, 500))
+    generate_renditions(post.pk)
+    post.refresh_from_db()
+    jpeg_only = {
+        'source': post.image.name,
+        'jpeg': post.image_renditions['jpeg'],
+    }
+    Post.objects.filter(pk=post.pk).update(image_renditions=jpeg_only)
+
+    generate_renditions(post.pk)
+    post.refresh_from_db()
+    assert post.image_renditions['webp']
+    names = [
+        item['name']
+        for kind in ('jpeg', 'webp')
+        for item in post.image_renditions[kind]
+    ]
+    assert all(default_storage.exists(name) for name in names), (
+        'Убедитесь, что при пересоздании копий того же изображения новые '
+        'файлы не удаляются вместе со старыми записями.'
+    )
+
+
+def test_image_savings_report(make_post, media_root):
+    post = make_post(image=make_image(1000, 500))
+    generate_renditions(post.pk)
+    post.refresh_from_db()
+
+    output = StringIO()
+    call_command('image_savings_report', stdout=output)
+    report = output.getvalue()
+    saved = post.image_renditions['webp_saved'] / 1024 / 1024
+    assert 'Оригиналов: 1' in report
+    assert 'Копий WebP: 3' in report
+    assert f'WebP экономит {saved:.2f} МБ' in report
+
+
+def test_upload_stores_size_and_placeholder(client, make_post):
+    post = make_post(image=make_image(1200, 800))
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (1200, 800)
+    assert post.image_placeholder.startswith('data:image/webp;base64,')
+
+    content = client.get('/').content.decode('utf-8')
+    assert 'width="1200" height="800" loading="lazy"' in content, (
+        'Убедитесь, что карточка задаёт размеры изображения и загружает '
+        'его лениво.'
+    )
+    assert f'url({post.image_placeholder})' in content
+
+    post.image = ''
+    post.save()
+    post.refresh_from_db()
+    assert post.image_width is None and post.image_placeholder == ''
+
+
+def test_rotated_upload_is_described_without_decoding(make_post, monkeypatch):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    output = BytesIO()
+    Image.new('RGB', (1200, 800), (73, 109, 137)).save(
+        output, 'JPEG', exif=exif.tobytes()
+    )
+    decoded = []
+    load = PILImageFile.ImageFile.load
+
+    def tracking_load(image):
+        decoded.append(image.size)
+        return load(image)
+
+    monkeypatch.setattr(PILImageFile.ImageFile, 'load', tracking_load)
+    post = make_post(image=ImageFile(output, name='photo.jpg'))
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (800, 1200), (
+        'Убедитесь, что размеры учитывают поворот из EXIF.'
+    )
+    assert post.image_placeholder
+    assert (1200, 800) not in decoded, (
+        'Убедитесь, что для размеров и заглушки загруженное изображение '
+        'не декодируется целиком.'
+    )
+
+
+def test_backfill_image_details(make_post):
+    post = make_post(image=make_image(640, 480))
+    Post.objects.filter(pk=post.pk).update(
+        image_width=None, image_height=None, image_placeholder=''
+    )
+
+    call_command('backfill_image_details', workers=2, stdout=StringIO())
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (640, 480)
+    assert post.image_placeholder
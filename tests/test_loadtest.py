@@ -0,0 +1,106 @@
+import json
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from blog.context_processors import get_menu_categories
+from blog.management.commands.loadtest import (
+    Client, parse_mix, percentile
+)
+from blog.pagination import get_feed_count_version
+from blog.models import Comment, Post
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest_against_running_server(live_server, tmp_path):
+    output = tmp_path / 'report.json'
+    call_command(
+        'loadtest',
+        url=live_server.url,
+        populate=True,
+        users=3,
+        posts=30,
+        comments=40,
+        clients=1,
+        duration=1,
+        mix='anonymous=1,logged_in=1,comment=1',
+        output=str(output),
+        stdout=StringIO(),
+        stderr=StringIO(),
+    )
+    report = json.loads(output.read_text('utf-8'))
+    assert Post.objects.count() == 30
+    assert report['total']['requests'] > 0
+    # One client: the in-memory test database locks under parallel writes.
+    assert report['total']['errors'] == 0, {
+        key: stats['statuses'] for key, stats in report['urls'].items()
+        if stats['errors']
+    }
+    for stats in report['urls'].values():
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+    assert any(key.startswith('comment:') for key in report['urls'])
+    assert Comment.objects.count() > 40, (
+        'Убедитесь, что нагрузочный тест отправляет комментарии от имени '
+        'вошедших пользователей.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_temporary_database_does_not_leak_into_site_cache(published_category):
+    menu = get_menu_categories()
+    call_command(
+        'loadtest',
+        users=3,
+        posts=30,
+        comments=20,
+        clients=1,
+        duration=1,
+        mix='anonymous=1',
+        stdout=StringIO(),
+        stderr=StringIO(),
+    )
+    assert get_menu_categories() == menu, (
+        'Убедитесь, что меню, собранное из временной базы нагрузочного '
+        'теста, не попадает в кэш сайта.'
+    )
+    version = get_feed_count_version()
+    assert cache.get(f'blog:feed-count:{version}:index') is None
+
+
+@pytest.mark.parametrize(
+    'mix',
+    ('anonymous=-5,comment=10', 'anonymous=0', 'robots=1', 'anonymous=nan'),
+)
+def test_parse_mix_rejects_invalid_weights(mix):
+    with pytest.raises(CommandError):
+        parse_mix(mix)
+
+
+@pytest.mark.django_db
+def test_clients_page_through_lists_by_cursor(
+        client, many_posts_with_published_locations
+):
+    target = SimpleNamespace(
+        sessions=['session'], read_url=lambda rng: ('index', '/', 3)
+    )
+    visitor = Client(0, target, None, {'anonymous': 1}, 0, seed=1)
+    request = visitor._read_request('anonymous')
+    assert request[2] == '/'
+    visitor._follow_next('anonymous', request[-1], client.get('/').content)
+
+    url = visitor._read_request('anonymous')[2]
+    assert url.startswith('/?cursor='), (
+        'Убедитесь, что нагрузочный тест листает ленты по ссылкам '
+        '?cursor=, которые отдаёт сайт, а не по номерам страниц.'
+    )
+    assert client.get(url).context['page_obj'].has_previous()
@@ -0,0 +1,110 @@
+import pytest
+
+from blog.media_files import parse_range
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture(autouse=True)
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / 'posts_images').mkdir()
+    path = tmp_path / 'posts_images' / 'photo.jpg'
+    path.write_bytes(CONTENT)
+    return path
+
+
+URL = '/media/posts_images/photo.jpg'
+
+
+def _body(response):
+    return b''.join(response.streaming_content)
+
+
+def test_media_file_is_streamed_with_validators(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.streaming, (
+        'Убедитесь, что файлы из MEDIA_ROOT отдаются потоком, а не '
+        'читаются в память целиком.'
+    )
+    assert _body(response) == CONTENT
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Content-Length'] == str(len(CONTENT))
+    assert response['Accept-Ranges'] == 'bytes'
+
+    etag = response['ETag']
+    response = client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    response = client.get(
+        URL, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize(
+    'header, start, end',
+    (
+        ('bytes=0-99', 0, 99),
+        ('bytes=10000-', 10000, len(CONTENT) - 1),
+        ('bytes=-24', len(CONTENT) - 24, len(CONTENT) - 1),
+        ('bytes=10000-99999', 10000, len(CONTENT) - 1),
+    ),
+)
+def test_range_requests(client, header, start, end):
+    response = client.get(URL, HTTP_RANGE=header)
+    assert response.status_code == 206
+    assert _body(response) == CONTENT[start:end + 1]
+    assert response['Content-Length'] == str(end - start + 1)
+    assert response['Content-Range'] == f'bytes {start}-{end}/{len(CONTENT)}'
+
+
+def test_unsatisfiable_and_ignored_ranges(client):
+    response = client.get(URL, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+    assert response.status_code == 416
+    assert response['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+    for header in ('bytes=0-1,5-6', 'items=0-1', 'bytes=5-1', 'bytes=x-'):
+        response = client.get(URL, HTTP_RANGE=header)
+        assert response.status_code == 200
+        assert _body(response) == CONTENT
+
+
+def test_if_range(client, media_file):
+    etag = client.get(URL)['ETag']
+    response = client.get(URL, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+    assert response.status_code == 206
+
+    media_file.write_bytes(CONTENT[::-1])
+    response = client.get(URL, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что после изменения файла докачка начинается заново.'
+    )
+    assert _body(response) == CONTENT[::-1]
+
+
+def test_sendfile_offload(client, settings, media_file):
+    settings.MEDIA_SENDFILE = 'x-accel-redirect'
+    response = client.get(URL)
+    assert response['X-Accel-Redirect'] == (
+        '/protected-media/posts_images/photo.jpg'
+    )
+    assert response.content == b''
+    assert response['Content-Type'] == 'image/jpeg'
+
+    settings.MEDIA_SENDFILE = 'x-sendfile'
+    assert client.get(URL)['X-Sendfile'] == str(media_file)
+
+
+def test_missing_and_outside_files(client):
+    assert client.get('/media/posts_images/missing.jpg').status_code == 404
+    assert client.get('/media/posts_images/').status_code == 404
+    assert client.get('/media/%2E%2E/manage.py').status_code == 404
+
+
+def test_parse_range_limits():
+    assert parse_range('bytes=0-0', 1) == (0, 0)
+    assert parse_range('bytes=-5', 3) == (0, 2)
+    assert parse_range('bytes=', 3) is None
@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _category_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [q for q in queries if 'blog_category' in q['sql']], response
+
+
+def test_menu_is_cached_between_requests(client, mixer):
+    mixer.blend('blog.Category', is_published=True, title='Кулинария')
+    first, response = _category_queries(client, '/pages/about/')
+    assert first
+    assert 'Кулинария' in response.content.decode('utf-8')
+
+    repeated, response = _category_queries(client, '/pages/about/')
+    assert not repeated, (
+        'Убедитесь, что список категорий для меню берётся из кэша, а не '
+        'запрашивается из базы данных на каждой странице.'
+    )
+    assert 'Кулинария' in response.content.decode('utf-8')
+
+
+def test_menu_follows_category_changes(client, mixer):
+    category = mixer.blend(
+        'blog.Category', is_published=True, title='Кулинария'
+    )
+    client.get('/pages/about/')
+
+    category.title = 'Походы'
+    category.save()
+    content = client.get('/pages/about/').content.decode('utf-8')
+    assert 'Походы' in content and 'Кулинария' not in content, (
+        'Убедитесь, что меню категорий обновляется при изменении категории.'
+    )
+
+    category.is_published = False
+    category.save()
+    content = client.get('/pages/about/').content.decode('utf-8')
+    assert 'Походы' not in content
+
+    category.delete()
+    client.get('/pages/about/')
+
+
+def test_menu_is_not_queried_where_unused(admin_client, published_category):
+    queries, _ = _category_queries(admin_client, '/admin/')
+    assert not queries, (
+        'Убедитесь, что категории для меню запрашиваются, только когда '
+        'шаблон их выводит.'
+    )
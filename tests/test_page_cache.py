@@ -0,0 +1,154 @@
+import importlib
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _cache_status(client, url):
+    return client.get(url).get('X-Page-Cache')
+
+
+def test_anonymous_page_is_served_from_cache(client, make_post):
+    post = make_post()
+    for url in ('/', f'/posts/{post.id}/', f'/profile/{post.author}/'):
+        assert _cache_status(client, url) == 'miss'
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response['X-Page-Cache'] == 'hit'
+        assert len(queries) == 0, (
+            'Убедитесь, что страница для анонимного посетителя отдаётся из '
+            'кэша без запросов к базе данных.'
+        )
+    assert _cache_status(client, '/?page=1') == 'miss'
+
+
+def test_logged_in_users_bypass_cache(user_client, make_post):
+    make_post()
+    user_client.get('/')
+    assert user_client.get('/').get('X-Page-Cache') is None
+
+
+def test_comment_invalidates_only_its_post_pages(
+        client, user_client, make_post
+):
+    post, other = make_post(), make_post()
+    for url in ('/', f'/posts/{post.id}/', f'/posts/{other.id}/'):
+        client.get(url)
+
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Привет'})
+    response = client.get(f'/posts/{post.id}/')
+    assert response['X-Page-Cache'] == 'miss'
+    assert 'Привет' in response.content.decode('utf-8')
+    assert _cache_status(client, '/') == 'miss', (
+        'Убедитесь, что лента обновляется, когда меняется число '
+        'комментариев у показанной в ней публикации.'
+    )
+    assert _cache_status(client, f'/posts/{other.id}/') == 'hit'
+
+
+def test_post_change_keeps_unrelated_pages(
+        client, make_post, another_user, another_category
+):
+    post = make_post()
+    other = make_post(author=another_user, category=another_category)
+    urls = {
+        'feed': '/',
+        'category': f'/category/{post.category.slug}/',
+        'other_category': f'/category/{another_category.slug}/',
+        'profile': f'/profile/{post.author}/',
+        'other_profile': f'/profile/{another_user}/',
+        'other_post': f'/posts/{other.id}/',
+    }
+    for url in urls.values():
+        client.get(url)
+
+    post.title = 'Новый заголовок'
+    post.save()
+    statuses = {name: _cache_status(client, url) for name, url in urls.items()}
+    assert statuses == {
+        'feed': 'miss',
+        'category': 'miss',
+        'other_category': 'hit',
+        'profile': 'miss',
+        'other_profile': 'hit',
+        'other_post': 'hit',
+    }
+
+    post.category = another_category
+    post.save()
+    assert _cache_status(client, urls['category']) == 'miss', (
+        'Убедитесь, что публикация, перенесённая в другую категорию, '
+        'пропадает со страницы прежней категории.'
+    )
+
+
+def test_author_and_location_changes(
+        client, make_post, published_location
+):
+    post = make_post(location=published_location)
+    url = f'/posts/{post.id}/'
+    client.get(url)
+
+    post.author.save(update_fields=['last_login'])
+    assert _cache_status(client, url) == 'hit'
+
+    post.author.username = 'renamed'
+    post.author.save()
+    assert 'renamed' in client.get(url).content.decode('utf-8')
+
+    published_location.name = 'Новое место'
+    published_location.save()
+    assert 'Новое место' in client.get(url).content.decode('utf-8')
+
+
+def test_category_change_drops_every_page(client, make_post, mixer):
+    post = make_post()
+    client.get(f'/posts/{post.id}/')
+    mixer.blend('blog.Category', is_published=True, title='Новая категория')
+    response = client.get(f'/posts/{post.id}/')
+    assert 'Новая категория' in response.content.decode('utf-8'), (
+        'Убедитесь, что меню категорий на закэшированных страницах '
+        'обновляется при изменении категорий.'
+    )
+
+
+@pytest.mark.parametrize('page', ('detail', 'feed'))
+def test_change_while_rendering_is_not_cached_as_fresh(
+        client, make_post, monkeypatch, page
+):
+    from blog import views
+
+    post = make_post(title='Старый заголовок')
+    url = {'detail': f'/posts/{post.id}/', 'feed': '/'}[page]
+    render = views.render
+
+    def render_after_change(*args, **kwargs):
+        # Another process saves the post after this one has queried it.
+        monkeypatch.setattr(views, 'render', render)
+        post.title = 'Новый заголовок'
+        post.save()
+        return render(*args, **kwargs)
+
+    monkeypatch.setattr(views, 'render', render_after_change)
+    assert 'Старый заголовок' in client.get(url).content.decode('utf-8')
+    response = client.get(url)
+    assert response['X-Page-Cache'] == 'miss', (
+        'Убедитесь, что страница, собранная до изменения публикации, '
+        'сохраняется в кэше с версиями тегов на момент запроса данных.'
+    )
+    assert 'Новый заголовок' in response.content.decode('utf-8')
+
+
+def test_cache_is_shared_between_processes(monkeypatch):
+    from blogicum import settings as project_settings
+
+    monkeypatch.delenv('BLOGICUM_CACHE_BACKEND', raising=False)
+    monkeypatch.delenv('BLOGICUM_CACHE_LOCATION', raising=False)
+    backend = importlib.reload(project_settings).CACHES['default']['BACKEND']
+    assert backend.endswith('MemcacheCache'), (
+        'Убедитесь, что по умолчанию кэш страниц и меню общий для всех '
+        'процессов и увеличивает версии атомарно.'
+    )
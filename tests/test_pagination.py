@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+from blog.pagination import (
+    FEED_COUNT_VERSION_KEY, get_feed_count_version, invalidate_feed_counts
+)
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _feed_ids(posts):
+    ordered = sorted(posts, key=lambda post: (post.pub_date, post.id))
+    return [post.id for post in reversed(ordered)]
+
+
+def _page_ids(response):
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_keyset_pages_walk_the_whole_feed(
+        client, many_posts_with_published_locations
+):
+    expected = _feed_ids(many_posts_with_published_locations)
+    seen = []
+    response = client.get('/')
+    while True:
+        page_obj = response.context['page_obj']
+        assert len(page_obj) <= N_PER_PAGE
+        seen.extend(_page_ids(response))
+        if not page_obj.has_next():
+            break
+        response = client.get(f'/?cursor={page_obj.next_cursor}')
+    assert seen == expected, (
+        'Убедитесь, что переход по курсорам ленты показывает каждую '
+        'публикацию ровно один раз, «от новых к старым».'
+    )
+
+
+def test_keyset_previous_cursor_returns_previous_page(
+        client, many_posts_with_published_locations
+):
+    first = client.get('/')
+    second = client.get(
+        f"/?cursor={first.context['page_obj'].next_cursor}"
+    )
+    previous_cursor = second.context['page_obj'].previous_cursor
+    back = client.get(f'/?cursor={previous_cursor}')
+    assert _page_ids(back) == _page_ids(first)
+
+
+def test_keyset_last_cursor(client, many_posts_with_published_locations):
+    expected = _feed_ids(many_posts_with_published_locations)
+    first = client.get('/')
+    last = client.get(f"/?cursor={first.context['page_obj'].last_cursor}")
+    assert _page_ids(last) == expected[-N_PER_PAGE:]
+    assert not last.context['page_obj'].has_next()
+
+
+def test_numbered_pages_fallback(
+        client, many_posts_with_published_locations
+):
+    expected = _feed_ids(many_posts_with_published_locations)
+    response = client.get('/?page=2')
+    assert response.context['page_obj'].number == 2
+    assert _page_ids(response) == expected[N_PER_PAGE:2 * N_PER_PAGE], (
+        'Убедитесь, что старые ссылки вида `?page=N` продолжают работать.'
+    )
+
+
+def test_malformed_cursor_shows_first_page(
+        client, many_posts_with_published_locations
+):
+    expected = _feed_ids(many_posts_with_published_locations)
+    response = client.get('/?cursor=not-a-cursor')
+    assert response.status_code == 200
+    assert _page_ids(response) == expected[:N_PER_PAGE]
+
+
+@pytest.fixture
+def hundreds_of_posts(user, published_category):
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {i}',
+            text='Текст',
+            pub_date=now - timedelta(minutes=i),
+            author=user,
+            category=published_category,
+        )
+        for i in range(N_PER_PAGE * 30)
+    )
+    return list(Post.objects.all())
+
+
+def test_numbered_page_window_is_bounded(client, hundreds_of_posts):
+    response = client.get('/?page=15')
+    content = response.content.decode('utf-8')
+    assert content.count('class="page-item') <= 15, (
+        'Убедитесь, что навигация по страницам показывает только первую, '
+        'последнюю и несколько соседних страниц.'
+    )
+    assert '?page=30' in content
+    assert '?page=16' in content
+    assert '?page=5"' not in content
+
+
+def test_numbered_page_count_is_cached(client, hundreds_of_posts):
+    client.get('/?page=2')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/?page=3')
+    assert not [q for q in queries if 'COUNT(' in q['sql']], (
+        'Убедитесь, что общее число публикаций в ленте берётся из кэша.'
+    )
+    assert response.context['page_obj'].paginator.count == len(
+        hundreds_of_posts
+    )
+
+    post = Post.objects.get(pk=hundreds_of_posts[0].pk)
+    post.is_published = False
+    post.save()
+    response = client.get('/?page=3')
+    assert response.context['page_obj'].paginator.count == len(
+        hundreds_of_posts
+    ) - 1, (
+        'Убедитесь, что кэш числа публикаций сбрасывается при снятии '
+        'публикации.'
+    )
+
+
+def test_feed_count_version_does_not_restart_after_eviction():
+    first = get_feed_count_version()
+    cache.delete(FEED_COUNT_VERSION_KEY)
+    invalidate_feed_counts()
+    assert get_feed_count_version() != first, (
+        'Убедитесь, что после вытеснения ключа версии счётчики ленты не '
+        'возвращаются к версии, под которой уже были закэшированы.'
+    )
@@ -0,0 +1,54 @@
+import pytest
+
+from blog.views import get_published_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(make_post, published_location):
+    return make_post(location=published_location)
+
+
+def _card_version(post):
+    return get_published_posts().get(pk=post.pk).card_version
+
+
+def test_card_version_follows_shown_data(post, mixer):
+    version = _card_version(post)
+    assert _card_version(post) == version
+
+    post.text = post.text + ' ещё'
+    post.save()
+    # Only the excerpt of the text is shown on the card.
+    changes = [
+        (post, 'title', 'Новый заголовок'),
+        (post.category, 'title', 'Новая категория'),
+        (post.location, 'name', 'Новое место'),
+        (post.author, 'username', 'new_name'),
+    ]
+    for obj, field, value in changes:
+        setattr(obj, field, value)
+        obj.save()
+        new_version = _card_version(post)
+        assert new_version != version, (
+            f'Убедитесь, что версия карточки меняется при изменении '
+            f'`{type(obj).__name__}.{field}`.'
+        )
+        version = new_version
+
+    mixer.blend('blog.Comment', post=post)
+    assert _card_version(post) != version
+
+
+def test_feed_shows_fresh_cards(user_client, post):
+    user_client.get('/')
+    post.title = 'Обновлённый заголовок'
+    post.save()
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Первый'})
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'Комментарии (1)' in content
+    assert 'Обновлённый заголовок' in content, (
+        'Убедитесь, что кэшированная карточка публикации обновляется при '
+        'изменении публикации.'
+    )
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+# Queries allowed per page whatever the number of posts and comments.
+# Feeds and post pages include 2-3 indexed MAX() lookups for validators.
+QUERY_BUDGETS = {
+    'index': 4,
+    'category_posts': 6,
+    'profile': 5,
+    'profile_owner': 7,
+    'post_detail': 5,
+    'post_detail_logged_in': 7,
+    'admin_posts': 8,
+    'admin_comments': 6,
+    'admin_categories': 6,
+    'admin_locations': 6,
+}
+
+
+@pytest.fixture(params=(10, 1000), ids=('10 posts', '1000 posts'))
+def feed(request, mixer, user, published_category, published_location):
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {i}',
+            text='Текст публикации',
+            pub_date=now - timedelta(minutes=i),
+            author=user,
+            category=published_category,
+            location=published_location,
+        )
+        for i in range(request.param)
+    )
+    post = Post.objects.order_by('-pub_date').first()
+    commenters = mixer.cycle(5).blend(get_user_model())
+    Comment.objects.bulk_create(
+        Comment(post=post, author=commenters[i % 5], text=f'Реплика {i}')
+        for i in range(request.param)
+    )
+    return post
+
+
+def test_public_pages_query_budget(client, feed, query_budget):
+    pages = {
+        'index': '/',
+        'category_posts': f'/category/{feed.category.slug}/',
+        'profile': f'/profile/{feed.author.username}/',
+        'post_detail': f'/posts/{feed.id}/',
+    }
+    for name, url in pages.items():
+        with query_budget(QUERY_BUDGETS[name], url):
+            assert client.get(url).status_code == 200
+
+
+def test_logged_in_pages_query_budget(user_client, feed, query_budget):
+    pages = {
+        'profile_owner': f'/profile/{feed.author.username}/',
+        'post_detail_logged_in': f'/posts/{feed.id}/',
+    }
+    for name, url in pages.items():
+        with query_budget(QUERY_BUDGETS[name], url):
+            assert user_client.get(url).status_code == 200
+
+
+def test_admin_changelists_query_budget(admin_client, feed, query_budget):
+    pages = {
+        'admin_posts': '/admin/blog/post/',
+        'admin_comments': '/admin/blog/comment/',
+        'admin_categories': '/admin/blog/category/',
+        'admin_locations': '/admin/blog/location/',
+    }
+    for name, url in pages.items():
+        with query_budget(QUERY_BUDGETS[name], url):
+            assert admin_client.get(url).status_code == 200
+
+
+def test_query_stats_headers(client, feed):
+    response = client.get('/')
+    assert int(response['X-Query-Count']) <= QUERY_BUDGETS['index']
+    assert response['X-Query-Time'].endswith('ms')
@@ -0,0 +1,145 @@
+from typing import List
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.conditional import category_timestamps, post_timestamps
+from blog.models import Comment, Post
+from blog.pagination import KeysetPaginator
+from blog.views import (
+    COMMENT_ORDERING,
+    COMMENTS_ON_PAGE,
+    FEED_ORDERING,
+    POSTS_ON_PAGE,
+    get_feed,
+    get_published_posts,
+)
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='EXPLAIN QUERY PLAN output is SQLite specific.',
+    ),
+]
+
+
+def explain(queryset) -> List[str]:
+    sql, params = queryset.query.get_compiler(
+        connection=connection
+    ).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_uses_indexes(queryset, description: str):
+    plan = explain(queryset)
+    bad_steps = [
+        step for step in plan
+        if step.startswith('SCAN') or 'TEMP B-TREE' in step
+    ]
+    assert not bad_steps, (
+        f'Запрос {description} выполняется без подходящего индекса: '
+        f'{bad_steps}. План целиком: {plan}'
+    )
+
+
+def feed_page(queryset):
+    return queryset[:POSTS_ON_PAGE + 1]
+
+
+def test_index_feed_plan():
+    assert_uses_indexes(feed_page(get_published_posts()), 'главной ленты')
+
+
+def test_category_feed_plan(published_category):
+    queryset = get_published_posts().filter(category=published_category)
+    assert_uses_indexes(feed_page(queryset), 'ленты категории')
+
+
+def test_author_feed_plan(user):
+    queryset = get_published_posts().filter(author=user)
+    assert_uses_indexes(feed_page(queryset), 'ленты автора')
+
+
+def test_owner_profile_plan(user):
+    queryset = get_feed(Post.objects.visible_to(user).filter(author=user))
+    assert_uses_indexes(feed_page(queryset), 'профиля для автора')
+
+
+def test_visible_post_lookup_plan(user, post_with_published_location):
+    # Same query as get_object_or_404(): get() drops the default ordering.
+    queryset = Post.objects.visible_to(user).with_feed_relations().filter(
+        pk=post_with_published_location.pk
+    ).order_by()
+    assert_uses_indexes(queryset, 'публикации с проверкой видимости')
+
+
+@pytest.mark.parametrize('forward', (True, False), ids=('next', 'previous'))
+def test_keyset_seek_plan(forward):
+    queryset = get_published_posts()
+    paginator = KeysetPaginator(queryset, POSTS_ON_PAGE, FEED_ORDERING)
+    ordering = FEED_ORDERING if forward else paginator._reversed_ordering()
+    seek = paginator._seek(queryset, [timezone.now(), 1], forward)
+    assert_uses_indexes(
+        feed_page(seek.order_by(*ordering)), 'страницы ленты по курсору'
+    )
+
+
+def test_feed_count_plan():
+    assert_uses_indexes(
+        get_published_posts().order_by(), 'подсчёта публикаций в ленте'
+    )
+
+
+def test_post_comments_plan(post_with_published_location):
+    queryset = Comment.objects.filter(
+        post=post_with_published_location
+    ).select_related('author')
+    assert_uses_indexes(queryset, 'комментариев к публикации')
+
+
+def test_post_comments_seek_plan(post_with_published_location):
+    queryset = Comment.objects.filter(
+        post=post_with_published_location
+    ).select_related('author')
+    paginator = KeysetPaginator(queryset, COMMENTS_ON_PAGE, COMMENT_ORDERING)
+    seek = paginator._seek(queryset, [timezone.now(), 1], True)
+    assert_uses_indexes(
+        seek.order_by(*COMMENT_ORDERING)[:COMMENTS_ON_PAGE + 1],
+        'следующей порции комментариев',
+    )
+
+
+def test_search_plan():
+    queryset = Post.objects.published().search('рецепт').with_feed_relations()
+    plan = explain(feed_page(queryset))
+    assert 'SEARCH blog_post USING INTEGER PRIMARY KEY (rowid=?)' in plan, (
+        'Убедитесь, что поиск берёт публикации по найденным в '
+        f'полнотекстовом индексе ключам: {plan}'
+    )
+    # Only the matches are sorted by rank, never the whole table.
+    bad_steps = [
+        step for step in plan
+        if step.startswith('SCAN') and 'VIRTUAL TABLE' not in step
+    ]
+    assert not bad_steps, (
+        f'Поиск перебирает таблицу целиком: {bad_steps}. План: {plan}'
+    )
+
+
+def test_validator_plans(post_with_published_location):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as queries:
+        category_timestamps(None, post.category.slug)
+        post_timestamps(None, post.pk)
+    for query in queries:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+            plan = [row[-1] for row in cursor.fetchall()]
+        assert not [step for step in plan if step.startswith('SCAN')], (
+            f'Валидатор {query["sql"]} выполняется без индекса: {plan}'
+        )
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+RAW_TEXT = '<b>жирный</b>\nвторая строка'
+RENDERED_TEXT = '&lt;b&gt;жирный&lt;/b&gt;<br>вторая строка'
+
+
+def test_post_and_comment_html_are_stored(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(
+        f'/posts/{post.id}/edit/',
+        data={
+            'title': post.title,
+            'text': RAW_TEXT,
+            'pub_date': post.pub_date.strftime('%Y-%m-%d %H:%M'),
+            'category': post.category.id,
+        },
+    )
+    post.refresh_from_db()
+    assert post.text_html == RENDERED_TEXT, (
+        'Убедитесь, что при редактировании поста обновляется его HTML.'
+    )
+
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Было'})
+    comment = Comment.objects.get(post=post)
+    user_client.post(
+        f'/posts/{post.id}/edit_comment/{comment.id}/',
+        data={'text': RAW_TEXT},
+    )
+    comment.refresh_from_db()
+    assert comment.text_html == RENDERED_TEXT, (
+        'Убедитесь, что при редактировании комментария обновляется его HTML.'
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(f'/posts/{post.id}/')
+    assert response.content.decode().count(RENDERED_TEXT) == 2
+    assert not [
+        query for query in queries
+        if '"blog_post"."text",' in query['sql']
+        or '"blog_comment"."text",' in query['sql']
+    ], 'Убедитесь, что страница поста не загружает исходный текст.'
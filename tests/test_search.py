@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.search import install, match_expression
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Полнотекстовый индекс построен на SQLite FTS5.',
+    ),
+]
+
+
+def _found_ids(response):
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_search_finds_posts_by_title_and_text(client, make_post):
+    in_title = make_post(title='Прогулка по набережной')
+    in_text = make_post(title='Выходные', text='Долгая прогулка вдоль реки')
+    make_post(title='Погода', text='Дождь весь день')
+
+    response = client.get('/search/', {'q': 'Прогулка'})
+    assert response.status_code == 200
+    assert _found_ids(response) == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск находит публикации по заголовку и тексту и '
+        'ставит совпадение в заголовке выше совпадения в тексте.'
+    )
+
+
+def test_search_finds_posts_by_comments(client, make_post, mixer):
+    in_text = make_post(title='Выходные', text='Пекли пирог с вишней')
+    discussed = make_post(title='Рецепты недели')
+    make_post(title='Погода')
+    mixer.blend('blog.Comment', post=discussed, text='А пирог удался?')
+    mixer.blend('blog.Comment', post=discussed, text='Пирог отличный')
+
+    response = client.get('/search/', {'q': 'пирог'})
+    assert _found_ids(response) == [in_text.id, discussed.id], (
+        'Убедитесь, что поиск находит публикации и по тексту их '
+        'комментариев, показывая каждую публикацию один раз после '
+        'совпадений в самих публикациях.'
+    )
+    assert response.context['page_obj'].paginator.count == 2
+
+
+def test_search_respects_visibility(
+        client, make_post, posts_with_unpublished_category
+):
+    visible = make_post(title='Секретный рецепт')
+    make_post(title='Секретный рецепт', is_published=False)
+    make_post(
+        title='Секретный рецепт', pub_date=timezone.now() + timedelta(days=1)
+    )
+    for post in posts_with_unpublished_category:
+        post.title = 'Секретный рецепт'
+        post.save()
+
+    response = client.get('/search/', {'q': 'секретный'})
+    assert _found_ids(response) == [visible.id], (
+        'Убедитесь, что поиск показывает только опубликованные публикации '
+        'с наступившей датой из опубликованных категорий.'
+    )
+
+
+def test_search_index_follows_changes(client, make_post):
+    post = make_post(title='Старый заголовок')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert _found_ids(client.get('/search/', {'q': 'старый'})) == []
+    assert _found_ids(client.get('/search/', {'q': 'новый'})) == [post.id]
+
+    Post.objects.filter(pk=post.pk).update(text='Обновлено запросом')
+    assert _found_ids(client.get('/search/', {'q': 'запросом'})) == [
+        post.id
+    ]
+
+    post.delete()
+    assert _found_ids(client.get('/search/', {'q': 'новый'})) == []
+
+
+@pytest.mark.parametrize(
+    'query', ('"', 'AND', 'NEAR(', '*', '-рецепт', 'title:x', '', '!!!')
+)
+def test_search_syntax_is_not_interpreted(client, make_post, query):
+    make_post(title='Рецепт')
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+
+
+def test_match_expression_quotes_words():
+    assert match_expression('Рецепт "пирога" OR*') == (
+        '"Рецепт" "пирога" "OR"'
+    )
+    assert match_expression(' -*') is None
+
+
+def test_search_pages_keep_query(client, make_post):
+    for i in range(12):
+        make_post(title=f'Заметка {i}')
+    response = client.get('/search/', {'q': 'заметка'})
+    assert response.context['page_obj'].paginator.count == 12
+    assert '?q=%D0%B7%D0%B0%D0%BC%D0%B5%D1%82%D0%BA%D0%B0&amp;page=2' in (
+        response.content.decode('utf-8')
+    )
+
+
+def test_admin_search_uses_full_text_index(
+        admin_client, make_post, mixer
+):
+    post = make_post(title='Пирог с яблоками')
+    make_post(title='Пирожное')
+    comment = mixer.blend('blog.Comment', post=post, text='Вкусный пирог')
+
+    response = admin_client.get('/admin/blog/post/', {'q': 'пирог'})
+    assert list(response.context['cl'].result_list) == [post]
+
+    response = admin_client.get('/admin/blog/comment/', {'q': 'пирог'})
+    assert list(response.context['cl'].result_list) == [comment]
+
+    Comment.objects.filter(pk=comment.pk).delete()
+    response = admin_client.get('/admin/blog/comment/', {'q': 'пирог'})
+    assert list(response.context['cl'].result_list) == []
+
+
+def test_install_restores_dropped_triggers(client, make_post):
+    post = make_post(title='Черновик')
+    # Django drops triggers when it rebuilds a table during a migration.
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TRIGGER blog_post_fts_update')
+    Post.objects.filter(pk=post.pk).update(title='Чистовик')
+    install(connection)
+    assert _found_ids(client.get('/search/', {'q': 'чистовик'})) == [post.id]
+    assert _found_ids(client.get('/search/', {'q': 'черновик'})) == []
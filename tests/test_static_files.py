@@ -0,0 +1,73 @@
+import gzip
+import re
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import Http404
+
+from blog.static_files import serve
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return tmp_path
+
+
+def _stylesheet_url(content, name):
+    match = re.search(
+        rf'href="(/static/css/{name}\.[0-9a-f]{{12}}\.css)"', content
+    )
+    assert match, (
+        f'Убедитесь, что {name}.css подключается по имени с отпечатком '
+        'содержимого.'
+    )
+    return match[1]
+
+
+def test_templates_use_plain_names_before_collectstatic(client):
+    content = client.get('/').content.decode('utf-8')
+    assert 'href="/static/css/site.css"' in content
+    assert 'href="/static/css/bootstrap.purged.css"' in content
+
+
+def test_collected_files_are_hashed_and_compressed(client, collected):
+    content = client.get('/').content.decode('utf-8')
+    url = _stylesheet_url(content, 'site')
+    _stylesheet_url(content, 'bootstrap.purged')
+    assert staticfiles_storage.exists(url[len('/static/'):] + '.gz')
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'].startswith('text/css')
+    assert 'immutable' in response['Cache-Control']
+    assert 'Accept-Encoding' in response['Vary']
+    original = (collected / 'css' / 'site.css').read_bytes()
+    assert gzip.decompress(b''.join(response.streaming_content)) == original
+
+
+def test_static_files_without_gzip_support(client, collected):
+    url = _stylesheet_url(client.get('/').content.decode('utf-8'), 'site')
+    for accept_encoding in ('', 'gzip;q=0, identity'):
+        response = client.get(url, HTTP_ACCEPT_ENCODING=accept_encoding)
+        assert not response.has_header('Content-Encoding')
+        original = (collected / 'css' / 'site.css').read_bytes()
+        assert b''.join(response.streaming_content) == original
+
+
+def test_plain_names_are_not_immutable(client, collected):
+    response = client.get('/static/css/site.css')
+    assert response.status_code == 200
+    assert 'immutable' not in response['Cache-Control'], (
+        'Убедитесь, что файлы без отпечатка не кэшируются навсегда.'
+    )
+
+
+def test_files_outside_static_root_are_not_served(rf, collected):
+    with pytest.raises(Http404):
+        serve(rf.get('/'), '../manage.py')